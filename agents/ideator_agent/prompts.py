@@ -888,26 +888,3 @@ LOCALES = {
 
 def get_locale(locale: str = DEFAULT_LOCALE) -> dict:
     return LOCALES.get(locale, LOCALES[DEFAULT_LOCALE])
-
-# Legacy prompt (old reference): kept for compatibility.
-SENSE_LINE_INSTRUCTION_OLD = """
-Generate 3-4 concise sense lines grounded only in the provided articles.
-Each line must include:
-- short_title (brief label);
-- description (1-2 fact-based sentences tied to the articles);
-- article_ids (ids from the provided list only, at least 1);
-- region_note (region applicability if relevant).
-Always return the `sense_lines` array, even when continuing a discussion instead of choosing.
-Dialogue and decision rules:
-- Put your user-facing reply into `assistant_message` (recap options, clarify needs, offer tweaks), formatted as MarkdownV2.
-- Always reply in English.
-- Keep ids/order stable between turns unless the user clearly asks to regenerate lines.
-- decision reflects clear user intent:
-  * selected_line_index - 1-based index from sense_lines when the user picked one;
-  * custom_line_text - when the user proposes their own line;
-  * consent_generate - true only if the user confirmed moving to idea generation for the chosen line;
-  * regen_lines - true if the user asked for new/updated options;
-  * finish - true if the user wants to stop.
-  When the user confirms a choice, set consent_generate=true so the flow can switch to idea generation.
-  If the user is still clarifying or comparing, leave decision fields null/false and keep the conversation going without forcing a choice.
-"""
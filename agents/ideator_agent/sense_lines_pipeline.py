@@ -19,6 +19,9 @@ Install (local-only):
   pip install sentence-transformers scikit-learn numpy
 
 Optional better RU stopwords:  pip install stopwordsiso
+Optional faster report JSON I/O:  pip install orjson
+Optional SIMD inner products for large reports:  pip install faiss-cpu
+Optional faster sentence dedup hashing:  pip install xxhash
 
 LLM mode (LangChain + OpenAI example):
   pip install langchain langchain-openai
@@ -35,22 +38,48 @@ Run:
 from __future__ import annotations
 
 import argparse
+import asyncio
 import contextlib
+import functools
+import hashlib
+import heapq
 import json
+import math
 import os
 import re
+import sqlite3
+import threading
+import weakref
 from collections import Counter, defaultdict
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Sequence, Tuple, TypedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Annotated, Any, Dict, List, Optional, Sequence, Tuple, TypedDict
 
 import numpy as np
-from sklearn.cluster import KMeans
+import scipy.sparse as sp
+import torch
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics import silhouette_score
 from sklearn.preprocessing import normalize
 
 from sentence_transformers import SentenceTransformer
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency guard
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import faiss
+except ImportError:  # pragma: no cover - optional dependency guard
+    faiss = None  # type: ignore[assignment]
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - optional dependency guard
+    xxhash = None  # type: ignore[assignment]
+
 from .models import IdeatorReport
 from .prompts import get_locale
 
@@ -89,13 +118,31 @@ REGION_REGEX = re.compile(
 )
 
 SENTENCE_SPLIT_REGEX = re.compile(r"(?<=[.!?…])\s+")
+SENTENCE_END_CHARS = frozenset(".!?…")
+
+# Upper bound on concurrently assembled sense lines (one worker per cluster).
+MAX_SENSE_LINE_WORKERS = 8
+
+# Client-side retries per LLM request, and slack on top of llm_timeout before a cluster
+# falls back to its local (non-LLM) fields.
+LLM_MAX_RETRIES = 3
+LLM_TIMEOUT_GRACE_S = 5
+
+# Below this many docs a plain NumPy GEMM beats building a faiss index.
+FAISS_MIN_DOCS = 2048
+
+# Up to this many docs k comes from sqrt(n/2) instead of a silhouette sweep.
+SMALL_REPORT_MAX_DOCS = 30
+
+# Smallest encode batch used on CUDA; small CPU-sized batches leave the GPU idle.
+GPU_MIN_BATCH_SIZE = 128
 
 
 # -----------------------------
 # Data models
 # -----------------------------
 
-@dataclass
+@dataclass(slots=True)
 class Article:
     idx: int
     title: str
@@ -106,13 +153,25 @@ class Article:
     importance: str = ""
     source_id: Optional[int] = None
     raw: Optional[Dict[str, Any]] = None
+    # title + summary + importance_reasoning, built once and shared by embedding and c-TF-IDF
+    _full_text: str = field(init=False, repr=False, default="")
 
-    def full_text(self) -> str:
+    def __post_init__(self) -> None:
         parts = []
         for x in (self.title, self.summary, self.importance_reasoning):
             if x := (x or "").strip():
                 parts.append(x)
-        return "\n".join(parts).strip()
+        self._full_text = "\n".join(parts).strip()
+
+    @property
+    def full_text(self) -> str:
+        # slots=True rules out functools.cached_property; the text is precomputed in __post_init__
+        return self._full_text
+
+    def release_text(self) -> None:
+        """Drop the joined text and raw payload once embedding and tags no longer need them."""
+        self._full_text = ""
+        self.raw = None
 
     def label(self) -> str:
         return (self.title or "").strip() or self.url
@@ -141,11 +200,28 @@ class SenseLineItem(TypedDict):
     region_note: str
 
 
+class SenseLineLLMFields(TypedDict):
+    """Per-cluster fields the LLM returns via structured output."""
+
+    short_title: Annotated[str, ..., "3 to 8 words, no quotes"]
+    description: Annotated[str, ..., "Cluster theme for ideation, generalized across the cluster"]
+    region_note: Annotated[str, ..., "Empty string if not clearly region-specific"]
+
+
 # -----------------------------
 # IO
 # -----------------------------
 
+def _json_loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def load_report(path: str) -> Dict[str, Any]:
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
@@ -188,6 +264,10 @@ def parse_articles(report: Dict[str, Any]) -> List[Article]:
 
 def save_output(path: str, obj: Dict[str, Any]) -> None:
     os.makedirs(os.path.dirname(os.path.abspath(path)) or ".", exist_ok=True)
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
     with open(path, "w", encoding="utf-8") as f:
         json.dump(obj, f, ensure_ascii=False, indent=2)
 
@@ -220,19 +300,196 @@ def get_stopwords_ru_list() -> Optional[List[str]]:
 # Embeddings + clustering
 # -----------------------------
 
+_EMBEDDER_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def _load_embedder(model_name: str, device: str) -> SentenceTransformer:
+    model = SentenceTransformer(model_name, device=device)
+    model.eval()
+    if str(model.device).startswith("cuda"):
+        # fp16 weights/activations: half the memory traffic, tensor-core matmuls
+        model.half()
+    return model
+
+
 def build_embedder(model_name: str, device: str) -> SentenceTransformer:
-    return SentenceTransformer(model_name, device=device)
+    """Return a process-wide SentenceTransformer per (model_name, device); weights load once."""
+    with _EMBEDDER_LOCK:
+        return _load_embedder(model_name, device)
+
+
+# encode() is not thread-safe on a shared model (the fast tokenizer raises "Already borrowed"),
+# so calls on the same cached instance are serialized.
+_ENCODE_LOCKS: "weakref.WeakKeyDictionary[SentenceTransformer, threading.Lock]" = weakref.WeakKeyDictionary()
+
+
+def _encode_lock(model: SentenceTransformer) -> threading.Lock:
+    with _EMBEDDER_LOCK:
+        lock = _ENCODE_LOCKS.get(model)
+        if lock is None:
+            lock = _ENCODE_LOCKS[model] = threading.Lock()
+        return lock
+
+
+def embed_texts(
+    model: SentenceTransformer,
+    texts: Sequence[str],
+    batch_size: int,
+    show_progress_bar: bool = True,
+) -> np.ndarray:
+    # No length pre-sort here: encode() already orders inputs by length before batching
+    # ("smart batching", minimal padding) and restores the caller's order on return.
+    if str(model.device).startswith("cuda"):
+        batch_size = max(batch_size, GPU_MIN_BATCH_SIZE)
+    with _encode_lock(model), torch.inference_mode():
+        emb = model.encode(
+            list(texts),
+            batch_size=batch_size,
+            show_progress_bar=show_progress_bar,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+    # float32 halves the bytes every KMeans / similarity pass moves compared to float64
+    return np.ascontiguousarray(emb, dtype=np.float32)
+
 
+_SQLITE_MAX_VARS = 900
 
-def embed_texts(model: SentenceTransformer, texts: Sequence[str], batch_size: int) -> np.ndarray:
-    emb = model.encode(
-        list(texts),
+
+def embed_texts_cached(
+    model: SentenceTransformer,
+    texts: Sequence[str],
+    batch_size: int,
+    *,
+    cache_path: Optional[str],
+    model_name: str,
+) -> np.ndarray:
+    """
+    embed_texts with an on-disk sqlite cache keyed by (sha256(text), model_name).
+    Only cache misses are sent to the embedder; rows come back in input order as float32.
+    Vectors are stored as float32 blobs, so a warm cache returns exactly what a cold run computed.
+    Duplicate texts (e.g. the same article crawled twice) are embedded once and scattered back.
+    """
+    positions: Dict[str, int] = {}
+    for t in texts:
+        positions.setdefault(t, len(positions))
+    if len(positions) < len(texts):
+        uniq_emb = embed_texts_cached(
+            model,
+            list(positions),
+            batch_size=batch_size,
+            cache_path=cache_path,
+            model_name=model_name,
+        )
+        return uniq_emb[np.fromiter((positions[t] for t in texts), dtype=np.int64, count=len(texts))]
+
+    if not cache_path:
+        return embed_texts(model, texts, batch_size=batch_size)
+
+    hashes = [hashlib.sha256(t.encode("utf-8")).hexdigest() for t in texts]
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)) or ".", exist_ok=True)
+    with contextlib.closing(sqlite3.connect(cache_path)) as conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS emb (hash TEXT, model TEXT, vec BLOB, PRIMARY KEY (hash, model))"
+        )
+        found: Dict[str, bytes] = {}
+        unique_hashes = list(dict.fromkeys(hashes))
+        for start in range(0, len(unique_hashes), _SQLITE_MAX_VARS):
+            chunk = unique_hashes[start : start + _SQLITE_MAX_VARS]
+            rows = conn.execute(
+                f"SELECT hash, vec FROM emb WHERE model = ? AND hash IN ({','.join('?' * len(chunk))})",
+                [model_name, *chunk],
+            )
+            found.update(rows)
+
+        miss_idx = [i for i, h in enumerate(hashes) if h not in found]
+        miss_emb = None
+        if miss_idx:
+            miss_emb = embed_texts(model, [texts[i] for i in miss_idx], batch_size=batch_size)
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO emb (hash, model, vec) VALUES (?, ?, ?)",
+                    [
+                        (hashes[i], model_name, vec.astype(np.float32).tobytes())
+                        for i, vec in zip(miss_idx, miss_emb)
+                    ],
+                )
+
+    if miss_emb is not None:
+        dim = miss_emb.shape[1]
+    elif found:
+        dim = np.frombuffer(next(iter(found.values())), dtype=np.float32).shape[0]
+    else:
+        return np.empty((0, 0), dtype=np.float32)
+
+    out = np.empty((len(texts), dim), dtype=np.float32)
+    for i, h in enumerate(hashes):
+        if h in found:
+            out[i] = np.frombuffer(found[h], dtype=np.float32)
+    if miss_emb is not None:
+        out[miss_idx] = miss_emb
+    return out
+
+
+def l2_normalize_rows(emb: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place, so Euclidean KMeans is cosine clustering and similarity is a dot product."""
+    emb /= np.clip(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12, None)
+    return emb
+
+
+def embed_articles(
+    embedder: SentenceTransformer,
+    articles: List[Article],
+    batch_size: int,
+    *,
+    cache_path: Optional[str],
+    model_name: str,
+) -> np.ndarray:
+    """
+    Unit-norm (n, d) float32 embeddings of title + summary + importance_reasoning per article.
+    Needed even with a fixed k: KMeans, centroid ordering and MMR descriptions all run on them.
+    """
+    # IMPORTANT: clustering input uses title + summary + importance_reasoning
+    docs = [a.full_text.strip() or a.title or a.url for a in articles]
+    doc_emb = embed_texts_cached(
+        embedder,
+        docs,
         batch_size=batch_size,
-        show_progress_bar=True,
-        convert_to_numpy=True,
-        normalize_embeddings=True,
+        cache_path=cache_path,
+        model_name=model_name,
     )
-    return emb.astype(np.float32, copy=False)
+    return l2_normalize_rows(doc_emb)  # once; clustering, silhouette and ordering rely on unit rows
+
+
+def silhouette_cosine(emb: np.ndarray, labels: np.ndarray) -> float:
+    """
+    Mean silhouette with cosine distance (same value as silhouette_score(..., metric="cosine")).
+    Rows of emb must already be L2-normalized (see l2_normalize_rows).
+    Cosine distance is linear in dot products, so a point's summed distance to cluster c is
+    n_c - x . sum(c): O(n*K*d) from per-cluster vector sums, never an n x n distance matrix.
+    """
+    X = np.asarray(emb, dtype=np.float32)
+    _, lab = np.unique(np.asarray(labels), return_inverse=True)
+    k = int(lab.max()) + 1
+    rows = np.arange(X.shape[0])
+
+    counts = np.bincount(lab, minlength=k).astype(np.float64)
+    sums = np.stack([X[lab == c].sum(axis=0, dtype=np.float64) for c in range(k)])
+
+    dist_sums = counts[None, :] - X @ sums.T  # (n, K)
+    dist_sums[rows, lab] -= 1.0 - np.einsum("ij,ij->i", X, X)  # drop self-distance
+    own = counts[lab]
+    a = dist_sums[rows, lab] / np.maximum(own - 1.0, 1.0)
+
+    mean_other = dist_sums / counts[None, :]
+    mean_other[rows, lab] = np.inf
+    b = mean_other.min(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sil = (b - a) / np.maximum(a, b)
+    sil[own == 1] = 0.0
+    return float(np.mean(np.nan_to_num(sil)))
 
 
 def choose_k_by_silhouette(
@@ -245,32 +502,85 @@ def choose_k_by_silhouette(
     min_k = max(2, min_k)
     max_k = max(min_k, max_k)
     max_k = min(max_k, n - 1) if n > 2 else 2
+    # k > n // 2 always leaves a singleton cluster, which the min-count check rejects anyway
+    max_k = max(min_k, min(max_k, n // 2))
+    # One contiguous float32 copy shared by every fit and silhouette in the sweep
+    emb = np.ascontiguousarray(emb, dtype=np.float32)
 
+    # Mini-batch fits are enough to rank candidate k; the final clustering uses full KMeans.
     best_k = min_k
     best_score = -1.0
     for k in range(min_k, max_k + 1):
-        km = KMeans(n_clusters=k, random_state=random_state, n_init="auto")
+        km = MiniBatchKMeans(
+            n_clusters=k,
+            batch_size=min(1024, n),
+            n_init=3,
+            max_iter=100,
+            random_state=random_state,
+        )
         labels = km.fit_predict(emb)
         counts = Counter(labels)
         if min(counts.values()) < 2:
             continue
-        score = silhouette_score(emb, labels, metric="cosine")
+        score = silhouette_cosine(emb, labels)
         if score > best_score:
             best_score = score
             best_k = k
     return best_k
 
 
+def choose_k(
+    emb: np.ndarray,
+    *,
+    k: int,
+    min_k: int,
+    max_k: int,
+    max_lines: int,
+    random_state: int,
+) -> int:
+    """
+    Cluster count: explicit k if given (>= 2), else the silhouette sweep capped by max_lines.
+    Small reports skip the sweep and use the sqrt(n/2) rule of thumb within [min_k, max_k].
+    """
+    n = emb.shape[0]
+    if k and k >= 2:
+        chosen_k = int(k)
+    else:
+        max_k = min(max_k, max_lines)
+        min_k = min(min_k, max_k)
+        if n <= SMALL_REPORT_MAX_DOCS:
+            chosen_k = max(min_k, min(max_k, int(round(math.sqrt(n / 2)))))
+        else:
+            chosen_k = choose_k_by_silhouette(emb, min_k=min_k, max_k=max_k, random_state=random_state)
+    return max(2, min(chosen_k, n - 1))
+
+
 def cluster_kmeans(emb: np.ndarray, k: int, random_state: int) -> Tuple[np.ndarray, np.ndarray]:
-    km = KMeans(n_clusters=k, random_state=random_state, n_init="auto")
+    # Elkan's triangle-inequality bounds skip most point-center distances at small k
+    km = KMeans(
+        n_clusters=k,
+        random_state=random_state,
+        n_init="auto",
+        algorithm="elkan",
+        max_iter=100,
+    )
     labels = km.fit_predict(emb)
     centers = normalize(km.cluster_centers_)
     return labels, centers
 
 
-def cosine_distance_to_centroid(A: np.ndarray, centroid: np.ndarray) -> np.ndarray:
-    # A: (n, d) normalized; centroid: (d,) normalized
-    return 1.0 - (A @ centroid.reshape(-1, 1)).reshape(-1)
+def centroid_similarities(doc_emb: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """(n, K) cosine similarities of L2-normalized docs to L2-normalized centers."""
+    centers = np.ascontiguousarray(centers, dtype=np.float32)
+    if faiss is None or doc_emb.shape[0] < FAISS_MIN_DOCS:
+        return doc_emb @ centers.T
+    k = centers.shape[0]
+    index = faiss.IndexFlatIP(centers.shape[1])
+    index.add(centers)
+    scores, ids = index.search(np.ascontiguousarray(doc_emb, dtype=np.float32), k)
+    sim = np.empty((doc_emb.shape[0], k), dtype=np.float32)
+    np.put_along_axis(sim, ids, scores, axis=1)
+    return sim
 
 
 # -----------------------------
@@ -278,37 +588,63 @@ def cosine_distance_to_centroid(A: np.ndarray, centroid: np.ndarray) -> np.ndarr
 # -----------------------------
 
 def compute_ctfidf_tags(
-    cluster_texts: List[str],
+    docs: List[str],
+    doc_classes: np.ndarray,
+    n_classes: int,
     stopwords_list: Optional[List[str]],
     top_n: int,
     ngram_max: int,
     min_df: int,
     max_df: float,
+    doc_emb: Optional[np.ndarray] = None,
+    centroids: Optional[np.ndarray] = None,
 ) -> List[List[str]]:
+    """
+    c-TF-IDF tags per class (cluster).
+    docs are tokenized once; doc_classes[j] is the class row of docs[j]. Each class is one
+    CountVectorizer document (its docs' tokens concatenated), so min_df/max_df keep
+    CountVectorizer's own semantics over classes, and n-grams never cross document boundaries.
+    With doc_emb (row per doc) + centroids (row per class), a 2*top_n candidate pool is pruned to
+    the top_n terms closest to the cluster centroid, keeping c-TF-IDF order among the survivors.
+    A term's vector is the mean embedding of the docs containing it, so no model calls are made.
+    """
     token_pattern = r"(?u)\b[0-9A-Za-zА-Яа-яЁё\-]{2,}\b"
-    vectorizer = CountVectorizer(
+    analyze = CountVectorizer(
         stop_words=stopwords_list,  # LIST or None (validation-safe)
         ngram_range=(1, ngram_max),
-        min_df=min_df,
-        max_df=max_df,
         token_pattern=token_pattern,
-    )
-    X = vectorizer.fit_transform(cluster_texts)
-
-    from sklearn.feature_extraction.text import TfidfTransformer
-    tfidf = TfidfTransformer(norm=None, use_idf=True, smooth_idf=True)
-    X_tfidf = tfidf.fit_transform(X)
-
-    vocab = np.array(vectorizer.get_feature_names_out())
-    tags_per_cluster: List[List[str]] = []
-    for i in range(X_tfidf.shape[0]):
-        row = X_tfidf.getrow(i)
-        if row.nnz == 0:
-            tags_per_cluster.append([])
+    ).build_analyzer()
+    doc_tokens = [analyze(doc) for doc in docs]
+
+    class_tokens: List[List[str]] = [[] for _ in range(n_classes)]
+    for tokens, cls in zip(doc_tokens, np.asarray(doc_classes).tolist()):
+        class_tokens[cls].extend(tokens)
+
+    vectorizer = CountVectorizer(analyzer=lambda tokens: tokens, min_df=min_df, max_df=max_df)
+    X = vectorizer.fit_transform(class_tokens).tocsr().astype(np.float64)
+
+    # Smoothed idf over class documents, applied in place
+    # (same weights as TfidfTransformer(norm=None, use_idf=True, smooth_idf=True)).
+    df = np.bincount(X.indices, minlength=X.shape[1])
+    idf = np.log((1.0 + n_classes) / (1.0 + df)) + 1.0
+    X.data *= idf[X.indices]
+
+    rerank = doc_emb is not None and centroids is not None
+    pool_n = top_n * 2 if rerank else top_n
+
+    vocab = vectorizer.get_feature_names_out()
+    candidates_per_cluster: List[List[str]] = []
+    for i in range(X.shape[0]):
+        start, end = X.indptr[i], X.indptr[i + 1]
+        if start == end:
+            candidates_per_cluster.append([])
             continue
-        idx = row.indices
-        data = row.data
-        top_idx = idx[np.argsort(-data)[:top_n]]
+        idx = X.indices[start:end]
+        data = X.data[start:end]
+        if len(data) > pool_n:
+            part = np.argpartition(-data, pool_n)[:pool_n]
+            idx, data = idx[part], data[part]
+        top_idx = idx[np.argsort(-data)]
         tags = vocab[top_idx].tolist()
 
         clean = []
@@ -318,6 +654,34 @@ def compute_ctfidf_tags(
             if len(t) > 56:
                 continue
             clean.append(t)
+        candidates_per_cluster.append(clean)
+
+    if not rerank:
+        return [clean[:top_n] for clean in candidates_per_cluster]
+
+    # Term vectors from the doc embeddings already computed for clustering:
+    # (terms x docs) presence @ doc_emb, then L2-normalized (sum and mean point the same way).
+    all_terms = list(dict.fromkeys(t for clean in candidates_per_cluster for t in clean))
+    term_pos = {t: j for j, t in enumerate(all_terms)}
+    rows: List[int] = []
+    cols: List[int] = []
+    for j, tokens in enumerate(doc_tokens):
+        for t in term_pos.keys() & set(tokens):
+            rows.append(term_pos[t])
+            cols.append(j)
+    presence = sp.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(all_terms), len(docs)),
+    )
+    term_emb = np.asarray(presence @ doc_emb, dtype=np.float32)
+    term_emb /= np.clip(np.linalg.norm(term_emb, axis=1, keepdims=True), 1e-12, None)
+
+    tags_per_cluster: List[List[str]] = []
+    for i, clean in enumerate(candidates_per_cluster):
+        if len(clean) > top_n:
+            sims = term_emb[[term_pos[t] for t in clean]] @ centroids[i]
+            keep = set(np.argsort(-sims, kind="stable")[:top_n].tolist())
+            clean = [t for j, t in enumerate(clean) if j in keep]
         tags_per_cluster.append(clean[:top_n])
     return tags_per_cluster
 
@@ -333,22 +697,26 @@ def make_short_title_from_tags(tags: List[str], max_len: int = 56) -> str:
 # Extractive description (MMR)
 # -----------------------------
 
-def split_sentences(text: str) -> List[str]:
-    text = (text or "").strip()
-    if not text:
-        return []
+@lru_cache(maxsize=4096)
+def _split_sentences_cached(text: str) -> Tuple[str, ...]:
     parts = SENTENCE_SPLIT_REGEX.split(text)
     out = []
     for p in parts:
-        s = re.sub(r"\s+", " ", p.strip())
-        if not s:
-            continue
+        s = " ".join(p.split())
         if len(s) < 35:
             continue
-        if not re.search(r"[.!?…]$", s):
+        if s[-1] not in SENTENCE_END_CHARS:
             s += "."
         out.append(s)
-    return out
+    return tuple(out)
+
+
+def split_sentences(text: str) -> List[str]:
+    text = (text or "").strip()
+    if not text:
+        return []
+    # The same summary/importance_reasoning is split repeatedly across candidate passes.
+    return list(_split_sentences_cached(text))
 
 
 def mmr_select(
@@ -377,6 +745,16 @@ def mmr_select(
     return selected
 
 
+def _dedup_key(s: str) -> str:
+    return " ".join(s.lower().split())
+
+
+def _dedup_hash(key: str) -> int:
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(key.encode("utf-8"))
+    return hash(key)
+
+
 def build_cluster_description_extractive(
     embedder: SentenceTransformer,
     cluster_articles: List[Article],
@@ -401,20 +779,26 @@ def build_cluster_description_extractive(
             if t and len(t) >= 35:
                 candidates.append(t if t.endswith(".") else f"{t}.")
 
-    # Deduplicate
-    seen = set()
-    sentences = []
+    # Deduplicate on a 64-bit hash of the normalized sentence; strings are compared only on hash hits
+    first_by_hash: Dict[int, int] = {}
+    collided: set = set()
+    sentences: List[str] = []
     for s in candidates:
-        key = re.sub(r"\s+", " ", s.lower()).strip()
-        if key in seen:
+        key = _dedup_key(s)
+        h = _dedup_hash(key)
+        pos = first_by_hash.get(h)
+        if pos is None:
+            first_by_hash[h] = len(sentences)
+        elif key in collided or _dedup_key(sentences[pos]) == key:
             continue
-        seen.add(key)
+        else:
+            collided.add(key)
         sentences.append(s)
 
     if not sentences:
         return "Articles in this cluster share a common theme; more source content is required."
 
-    sent_emb = embed_texts(embedder, sentences, batch_size=batch_size)
+    sent_emb = embed_texts(embedder, sentences, batch_size=batch_size, show_progress_bar=False)
     pick = mmr_select(sent_emb, centroid=centroid, top_n=max_sentences, lambda_param=0.75)
     chosen = [sentences[i] for i in pick[:max_sentences]]
     return " ".join(chosen).strip()
@@ -431,9 +815,13 @@ def region_note_for_cluster(
 ) -> str:
     counts = Counter()
     for a in cluster_articles:
-        text = f"{a.title} {a.summary} {a.importance_reasoning}"
-        hits = [m.group(1) for m in REGION_REGEX.finditer(text)]
-        for h in set(hits):
+        hits = {
+            m.group(1)
+            for x in (a.title, a.summary, a.importance_reasoning)
+            if x
+            for m in REGION_REGEX.finditer(x)
+        }
+        for h in hits:
             counts[h] += 1
 
     if not counts:
@@ -451,15 +839,21 @@ def region_note_for_cluster(
 # -----------------------------
 
 def ordered_indices_by_centroid(
-    doc_emb: np.ndarray,
-    indices: List[int],
-    centroid: np.ndarray,
-) -> List[int]:
-    emb_cluster = doc_emb[indices]
-    d = cosine_distance_to_centroid(emb_cluster, centroid)
-    # stable tie-break by original index
-    order = sorted(range(len(indices)), key=lambda i: (float(d[i]), indices[i]))
-    return [indices[i] for i in order]
+    labels: np.ndarray,
+    own_sim: np.ndarray,
+) -> Dict[int, List[int]]:
+    """
+    Per-cluster doc indices ordered by similarity to their own centroid, from one lexsort.
+    own_sim: (n,) cosine similarity of each doc to its cluster's centroid.
+    Descending similarity == ascending cosine distance; stable tie-break by original index.
+    """
+    labels = np.asarray(labels)
+    order = np.lexsort((np.arange(labels.shape[0]), -own_sim, labels))
+    cluster_ids, starts = np.unique(labels[order], return_index=True)
+    return {
+        int(cid): chunk.tolist()
+        for cid, chunk in zip(cluster_ids.tolist(), np.split(order, starts[1:]))
+    }
 
 
 def build_cluster_manifest(
@@ -487,33 +881,38 @@ def build_cluster_manifest(
     for i, lab in enumerate(labels.tolist()):
         cluster_to_idxs[int(lab)].append(i)
 
-    # Keep largest clusters if too many
-    clusters = sorted(cluster_to_idxs.items(), key=lambda kv: (-len(kv[1]), kv[0]))
-    clusters = clusters[:max_lines]
+    # Keep largest clusters if too many (partial selection; same result as sorted(...)[:max_lines])
+    clusters = heapq.nsmallest(max_lines, cluster_to_idxs.items(), key=lambda kv: (-len(kv[1]), kv[0]))
 
-    # c-TF-IDF class-docs
-    cluster_texts: List[str] = []
-    cluster_ids: List[int] = []
-    for cid, idxs in clusters:
-        cluster_ids.append(cid)
-        joined = "\n".join(articles[i].full_text() for i in idxs if articles[i].full_text())
-        cluster_texts.append(joined[:2_000_000])
+    # c-TF-IDF over the kept clusters' documents (one vectorizer pass, no joined class texts)
+    cluster_ids = [cid for cid, _ in clusters]
+    doc_idxs = [i for _, idxs in clusters for i in idxs]
+    docs = [articles[i].full_text for i in doc_idxs]
+    doc_classes = np.repeat(np.arange(len(clusters)), [len(idxs) for _, idxs in clusters])
 
     tags_per_cluster = compute_ctfidf_tags(
-        cluster_texts=cluster_texts,
+        docs=docs,
+        doc_classes=doc_classes,
+        n_classes=len(clusters),
         stopwords_list=stopwords_list,
         top_n=top_tags,
         ngram_max=ngram_max,
         min_df=min_df,
         max_df=max_df,
+        doc_emb=doc_emb[doc_idxs],
+        centroids=centers[cluster_ids],
     )
 
+    # All doc-to-centroid cosine similarities at once (rows and centers are L2-normalized).
+    sim = centroid_similarities(doc_emb, centers)
+    own_sim = sim[np.arange(sim.shape[0]), labels]
+    ordered_by_cluster = ordered_indices_by_centroid(labels, own_sim)
+
     manifests: List[Dict[str, Any]] = []
     for pos, cid in enumerate(cluster_ids):
         idxs = cluster_to_idxs[cid]
-        centroid = centers[cid]
 
-        ordered_all = ordered_indices_by_centroid(doc_emb, idxs, centroid)
+        ordered_all = ordered_by_cluster[cid]
         nearest_doc_idx = ordered_all[0] if ordered_all else min(idxs)
         cluster_key = (-len(idxs), nearest_doc_idx)  # stable ordering key
 
@@ -548,27 +947,24 @@ def safe_json_extract(s: str) -> Dict[str, Any]:
     if not s:
         return {}
     with contextlib.suppress(Exception):
-        return json.loads(s)
+        return _json_loads(s)
     m = re.search(r"\{.*\}", s, flags=re.DOTALL)
     if not m:
         return {}
     try:
-        return json.loads(m.group(0))
+        return _json_loads(m.group(0))
     except Exception:
         return {}
 
 
-def llm_refine_cluster_fields_langchain(
+def build_cluster_llm_messages(
     *,
-    llm,  # LangChain ChatModel
     cluster_tags: List[str],
     rep_items: List[Dict[str, str]],
     region_hint: str,
-    local_fallback_title: str,
-    local_fallback_desc: str,
     max_description_sentences: int,
     locale: str = "en",
-) -> Tuple[str, str, str]:
+) -> List[Any]:
     locale_prompts = get_locale(locale)["prompts"]
     system = locale_prompts["sense_line_llm_system"].format(
         max_description_sentences=max_description_sentences
@@ -587,9 +983,18 @@ def llm_refine_cluster_fields_langchain(
 
     from langchain_core.messages import SystemMessage, HumanMessage
 
-    resp = llm.invoke([SystemMessage(content=system), HumanMessage(content=user)])
-    content = getattr(resp, "content", "") or ""
-    data = safe_json_extract(content)
+    return [SystemMessage(content=system), HumanMessage(content=user)]
+
+
+def parse_cluster_llm_response(
+    resp: Any,
+    *,
+    local_fallback_title: str,
+    local_fallback_desc: str,
+    max_description_sentences: int,
+) -> Tuple[str, str, str]:
+    # Structured output yields a dict; a plain chat message still goes through JSON extraction
+    data = resp if isinstance(resp, dict) else safe_json_extract(getattr(resp, "content", "") or "")
 
     short_title = str(data.get("short_title", "") or "").strip() or local_fallback_title
     description = str(data.get("description", "") or "").strip() or local_fallback_desc
@@ -608,11 +1013,63 @@ def llm_refine_cluster_fields_langchain(
     return short_title, description, region_note
 
 
-def build_llm_model_langchain(
+def llm_refine_cluster_fields_langchain(
+    *,
+    llm,  # LangChain ChatModel
+    cluster_tags: List[str],
+    rep_items: List[Dict[str, str]],
+    region_hint: str,
+    local_fallback_title: str,
+    local_fallback_desc: str,
+    max_description_sentences: int,
+    locale: str = "en",
+) -> Tuple[str, str, str]:
+    messages = build_cluster_llm_messages(
+        cluster_tags=cluster_tags,
+        rep_items=rep_items,
+        region_hint=region_hint,
+        max_description_sentences=max_description_sentences,
+        locale=locale,
+    )
+    resp = llm.invoke(messages)
+    return parse_cluster_llm_response(
+        resp,
+        local_fallback_title=local_fallback_title,
+        local_fallback_desc=local_fallback_desc,
+        max_description_sentences=max_description_sentences,
+    )
+
+
+_LLM_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LLM_LOOP_LOCK = threading.Lock()
+
+
+def _get_llm_loop() -> asyncio.AbstractEventLoop:
+    """Background event loop shared by all LLM batches (async clients stay bound to one loop)."""
+    global _LLM_LOOP
+    with _LLM_LOOP_LOCK:
+        if _LLM_LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="sense-lines-llm", daemon=True).start()
+            _LLM_LOOP = loop
+        return _LLM_LOOP
+
+
+def _run_coroutine(coro):
+    """Run ``coro`` to completion from sync code, even when called inside a running event loop."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_llm_loop()).result()
+
+
+_LLM_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def _load_llm_model_langchain(
     model_name: str,
     temperature: float,
     max_tokens: int,
     timeout: int,
+    max_retries: int,
 ):
     try:
         from langchain_openai import ChatOpenAI
@@ -626,15 +1083,74 @@ def build_llm_model_langchain(
         temperature=temperature,
         max_tokens=max_tokens,
         timeout=timeout,
+        max_retries=max_retries,
         #api_key=OPENAI_API_KEY,
     )
 
 
+def build_llm_model_langchain(
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    timeout: int,
+    max_retries: int = LLM_MAX_RETRIES,
+):
+    """Return a shared ChatOpenAI per settings so its HTTP connection pool is reused across calls."""
+    with _LLM_LOCK:
+        return _load_llm_model_langchain(model_name, temperature, max_tokens, timeout, max_retries)
+
+
 # -----------------------------
 # Sense lines assembly
 # -----------------------------
 
-def build_sense_lines(
+def _cluster_local_fields(
+    m: Dict[str, Any],
+    *,
+    embedder: SentenceTransformer,
+    articles: List[Article],
+    centers: np.ndarray,
+    batch_size: int,
+    max_description_sentences: int,
+) -> Dict[str, Any]:
+    cid = int(m["cluster_id"])
+    ordered_all: List[int] = m["ordered_indices_all"]
+    rep_llm: List[int] = m["rep_indices_llm"]
+
+    cluster_articles = [articles[j] for j in ordered_all]  # stable order
+    centroid = centers[cid]
+
+    local_region = region_note_for_cluster(cluster_articles)
+    local_desc = build_cluster_description_extractive(
+        embedder=embedder,
+        cluster_articles=cluster_articles,
+        centroid=centroid,
+        batch_size=batch_size,
+        max_sentences=max_description_sentences,
+    )
+
+    # LLM sees only representative subset (for cost/latency) but output applies to whole cluster
+    rep_items = []
+    for j in rep_llm[: min(6, len(rep_llm))]:
+        a = articles[j]
+        rep_items.append(
+            {
+                "title": a.title,
+                "summary": a.summary,
+                "importance_reasoning": a.importance_reasoning,
+                "url": a.url,
+            }
+        )
+
+    return {
+        "title": m["local_short_title"],
+        "description": local_desc,
+        "region_note": local_region,
+        "rep_items": rep_items,
+    }
+
+
+async def abuild_sense_lines(
     *,
     embedder: SentenceTransformer,
     articles: List[Article],
@@ -648,7 +1164,11 @@ def build_sense_lines(
     llm_timeout: int,
     max_description_sentences: int,
     locale: str = "en",
+    llm_concurrency: int = MAX_SENSE_LINE_WORKERS,
 ) -> List[SenseLine]:
+    if not cluster_manifests:
+        return []
+
     llm = None
     if use_llm:
         llm = build_llm_model_langchain(
@@ -656,62 +1176,70 @@ def build_sense_lines(
             temperature=llm_temperature,
             max_tokens=llm_max_tokens,
             timeout=llm_timeout,
+        ).with_structured_output(SenseLineLLMFields)
+
+    loop = asyncio.get_running_loop()
+    sem = asyncio.Semaphore(max(1, llm_concurrency))
+
+    async def _build_fields(m: Dict[str, Any], executor: ThreadPoolExecutor) -> Tuple[str, str, str]:
+        # Local fields run off the event loop so each cluster's LLM call can start as soon as its
+        # own fields are ready; the sentence encodes inside them are serialized per model.
+        try:
+            f = await loop.run_in_executor(
+                executor,
+                functools.partial(
+                    _cluster_local_fields,
+                    m,
+                    embedder=embedder,
+                    articles=articles,
+                    centers=centers,
+                    batch_size=batch_size,
+                    max_description_sentences=max_description_sentences,
+                ),
+            )
+        except Exception:
+            # One bad cluster must not abort the gather for the others
+            return (
+                m["local_short_title"],
+                "Articles in this cluster share a common theme; more source content is required.",
+                "",
+            )
+        local = (f["title"], f["description"], f["region_note"])
+        if llm is None:
+            return local
+
+        messages = build_cluster_llm_messages(
+            cluster_tags=m["tags"][:8],
+            rep_items=f["rep_items"],
+            region_hint=f["region_note"],
+            max_description_sentences=max_description_sentences,
+            locale=locale,
         )
-
-    sense_lines: List[SenseLine] = []
-    for i, m in enumerate(cluster_manifests, start=1):
-        cid = int(m["cluster_id"])
-        ordered_all: List[int] = m["ordered_indices_all"]
-        rep_llm: List[int] = m["rep_indices_llm"]
-        tags: List[str] = m["tags"]
-        local_title: str = m["local_short_title"]
-
-        cluster_articles = [articles[j] for j in ordered_all]  # stable order
-        centroid = centers[cid]
-
-        local_region = region_note_for_cluster(cluster_articles)
-        local_desc = build_cluster_description_extractive(
-            embedder=embedder,
-            cluster_articles=cluster_articles,
-            centroid=centroid,
-            batch_size=batch_size,
-            max_sentences=max_description_sentences,
-        )
-
-        short_title = local_title
-        description = local_desc
-        region_note = local_region
-
-        # LLM sees only representative subset (for cost/latency) but output applies to whole cluster
-        rep_items = []
-        for j in rep_llm[: min(6, len(rep_llm))]:
-            a = articles[j]
-            rep_items.append(
-                {
-                    "title": a.title,
-                    "summary": a.summary,
-                    "importance_reasoning": a.importance_reasoning,
-                    "url": a.url,
-                }
+        try:
+            async with sem:
+                # Hard per-cluster bound so one stuck request cannot stall the whole pipeline
+                resp = await asyncio.wait_for(
+                    llm.ainvoke(messages),
+                    timeout=llm_timeout + LLM_TIMEOUT_GRACE_S,
+                )
+            return parse_cluster_llm_response(
+                resp,
+                local_fallback_title=f["title"],
+                local_fallback_desc=f["description"],
+                max_description_sentences=max_description_sentences,
             )
+        except Exception:
+            return local
 
-        if use_llm and llm is not None:
-            try:
-                short_title, description, region_note = llm_refine_cluster_fields_langchain(
-                    llm=llm,
-                    cluster_tags=tags[:8],
-                    rep_items=rep_items,
-                    region_hint=local_region,
-                    local_fallback_title=local_title,
-                    local_fallback_desc=local_desc,
-                    max_description_sentences=max_description_sentences,
-                    locale=locale,
-                )
-            except Exception:
-                short_title, description, region_note = local_title, local_desc, local_region
+    max_workers = min(len(cluster_manifests), MAX_SENSE_LINE_WORKERS)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # gather preserves manifest order
+        fields = await asyncio.gather(*(_build_fields(m, executor) for m in cluster_manifests))
 
+    sense_lines: List[SenseLine] = []
+    for i, (m, (short_title, description, region_note)) in enumerate(zip(cluster_manifests, fields), start=1):
         # Include ALL cluster articles
-        links_all = [{"title": articles[j].label(), "url": articles[j].url} for j in ordered_all]
+        links_all = [{"title": articles[j].label(), "url": articles[j].url} for j in m["ordered_indices_all"]]
 
         sense_lines.append(
             SenseLine(
@@ -726,6 +1254,42 @@ def build_sense_lines(
     return sense_lines
 
 
+def build_sense_lines(
+    *,
+    embedder: SentenceTransformer,
+    articles: List[Article],
+    centers: np.ndarray,
+    cluster_manifests: List[Dict[str, Any]],
+    batch_size: int,
+    use_llm: bool,
+    llm_model_name: str,
+    llm_temperature: float,
+    llm_max_tokens: int,
+    llm_timeout: int,
+    max_description_sentences: int,
+    locale: str = "en",
+    llm_concurrency: int = MAX_SENSE_LINE_WORKERS,
+) -> List[SenseLine]:
+    """Sync wrapper over abuild_sense_lines (safe to call from inside a running event loop)."""
+    return _run_coroutine(
+        abuild_sense_lines(
+            embedder=embedder,
+            articles=articles,
+            centers=centers,
+            cluster_manifests=cluster_manifests,
+            batch_size=batch_size,
+            use_llm=use_llm,
+            llm_model_name=llm_model_name,
+            llm_temperature=llm_temperature,
+            llm_max_tokens=llm_max_tokens,
+            llm_timeout=llm_timeout,
+            max_description_sentences=max_description_sentences,
+            locale=locale,
+            llm_concurrency=llm_concurrency,
+        )
+    )
+
+
 def build_output_object(sense_lines: List[SenseLine], total_articles: int, k: int, llm_used: bool) -> Dict[str, Any]:
     assistant_message = (
         f"Generated {len(sense_lines)} sense lines from {total_articles} articles (k={k}). "
@@ -815,6 +1379,7 @@ def build_sense_lines_from_report(
     embedding_model: str = DEFAULT_EMBEDDING_MODEL,
     device: str = "cpu",
     batch_size: int = 64,
+    embedding_cache_path: Optional[str] = None,
     k: int = 0,
     min_k: int = 3,
     max_k: int = 6,
@@ -829,8 +1394,9 @@ def build_sense_lines_from_report(
     llm: bool = True,
     llm_model: str = "gpt-4.1-mini",
     llm_temperature: float = 0.0,
-    llm_max_tokens: int = 1024,
+    llm_max_tokens: int = 512,
     llm_timeout: int = 60,
+    llm_concurrency: int = MAX_SENSE_LINE_WORKERS,
     locale: str = "en",
 ) -> List[SenseLineItem]:
     articles = _report_to_articles(report)
@@ -839,18 +1405,17 @@ def build_sense_lines_from_report(
 
     embedder = build_embedder(embedding_model, device)
 
-    docs = [a.full_text() for a in articles]
-    docs = [d if d.strip() else (articles[i].title or articles[i].url) for i, d in enumerate(docs)]
-    doc_emb = embed_texts(embedder, docs, batch_size=batch_size)
-
-    if k and k >= 2:
-        chosen_k = k
-    else:
-        max_k = min(max_k, max_lines)
-        min_k = min(min_k, max_k)
-        chosen_k = choose_k_by_silhouette(doc_emb, min_k=min_k, max_k=max_k, random_state=random_state)
+    doc_emb = embed_articles(
+        embedder,
+        articles,
+        batch_size=batch_size,
+        cache_path=embedding_cache_path,
+        model_name=embedding_model,
+    )
 
-    chosen_k = max(2, min(chosen_k, len(articles) - 1))
+    chosen_k = choose_k(
+        doc_emb, k=k, min_k=min_k, max_k=max_k, max_lines=max_lines, random_state=random_state
+    )
     labels, centers = cluster_kmeans(doc_emb, k=chosen_k, random_state=random_state)
 
     manifests = build_cluster_manifest(
@@ -865,6 +1430,9 @@ def build_sense_lines_from_report(
         min_df=min_df,
         max_df=max_df,
     )
+    # Only per-field text (title/summary/reasoning/url) is used from here on
+    for a in articles:
+        a.release_text()
 
     sense_lines = build_sense_lines(
         embedder=embedder,
@@ -879,6 +1447,7 @@ def build_sense_lines_from_report(
         llm_timeout=llm_timeout,
         max_description_sentences=max(1, max_description_sentences),
         locale=locale,
+        llm_concurrency=llm_concurrency,
     )
     return _build_sense_line_items(
         sense_lines=sense_lines,
@@ -908,6 +1477,11 @@ def main() -> None:
     p.add_argument("--embedding_model", default=DEFAULT_EMBEDDING_MODEL)
     p.add_argument("--device", default="cpu", help="cpu or cuda")
     p.add_argument("--batch_size", type=int, default=64)
+    p.add_argument(
+        "--embedding_cache",
+        default=None,
+        help="Path to sqlite embedding cache keyed by (text sha256, model); disabled if omitted",
+    )
 
     # Clustering
     p.add_argument("--k", type=int, default=0, help="Fixed k (0 => auto via silhouette)")
@@ -942,8 +1516,14 @@ def main() -> None:
     )
     p.add_argument("--llm_model", default="gpt-4.1-mini", help="Chat model name (LangChain provider)")
     p.add_argument("--llm_temperature", type=float, default=0.0)
-    p.add_argument("--llm_max_tokens", type=int, default=1024)
+    p.add_argument("--llm_max_tokens", type=int, default=512)
     p.add_argument("--llm_timeout", type=int, default=60)
+    p.add_argument(
+        "--llm_concurrency",
+        type=int,
+        default=MAX_SENSE_LINE_WORKERS,
+        help="Max in-flight LLM requests across clusters",
+    )
 
     args = p.parse_args()
 
@@ -954,20 +1534,23 @@ def main() -> None:
 
     embedder = build_embedder(args.embedding_model, args.device)
 
-    # IMPORTANT: clustering input uses title + summary + importance_reasoning
-    docs = [a.full_text() for a in articles]
-    docs = [d if d.strip() else (articles[i].title or articles[i].url) for i, d in enumerate(docs)]
-    doc_emb = embed_texts(embedder, docs, batch_size=args.batch_size)
+    doc_emb = embed_articles(
+        embedder,
+        articles,
+        batch_size=args.batch_size,
+        cache_path=args.embedding_cache,
+        model_name=args.embedding_model,
+    )
 
     # Choose k (cap by max_lines)
-    if args.k and args.k >= 2:
-        k = int(args.k)
-    else:
-        max_k = min(args.max_k, args.max_lines)
-        min_k = min(args.min_k, max_k)
-        k = choose_k_by_silhouette(doc_emb, min_k=min_k, max_k=max_k, random_state=args.random_state)
-
-    k = max(2, min(k, len(articles) - 1))
+    k = choose_k(
+        doc_emb,
+        k=args.k,
+        min_k=args.min_k,
+        max_k=args.max_k,
+        max_lines=args.max_lines,
+        random_state=args.random_state,
+    )
     labels, centers = cluster_kmeans(doc_emb, k=k, random_state=args.random_state)
 
     # Stable manifests (ordering, tags, ALL article ordering)
@@ -983,19 +1566,25 @@ def main() -> None:
         min_df=args.min_df,
         max_df=args.max_df,
     )
+    # Only per-field text (title/summary/reasoning/url) is used from here on
+    for a in articles:
+        a.release_text()
 
-    sense_lines = build_sense_lines(
-        embedder=embedder,
-        articles=articles,
-        centers=centers,
-        cluster_manifests=manifests,
-        batch_size=args.batch_size,
-        use_llm=bool(args.llm),
-        llm_model_name=args.llm_model,
-        llm_temperature=args.llm_temperature,
-        llm_max_tokens=args.llm_max_tokens,
-        llm_timeout=args.llm_timeout,
-        max_description_sentences=max(1, int(args.max_description_sentences)),
+    sense_lines = asyncio.run(
+        abuild_sense_lines(
+            embedder=embedder,
+            articles=articles,
+            centers=centers,
+            cluster_manifests=manifests,
+            batch_size=args.batch_size,
+            use_llm=bool(args.llm),
+            llm_model_name=args.llm_model,
+            llm_temperature=args.llm_temperature,
+            llm_max_tokens=args.llm_max_tokens,
+            llm_timeout=args.llm_timeout,
+            max_description_sentences=max(1, int(args.max_description_sentences)),
+            llm_concurrency=max(1, int(args.llm_concurrency)),
+        )
     )
 
     out_obj = build_output_object(sense_lines, total_articles=len(articles), k=k, llm_used=bool(args.llm))
@@ -19,9 +19,8 @@ def _keep_first(current: IdeatorReport | None, new: IdeatorReport | None) -> Ide
     return current if current is not None else new
 
 def _merge_dicts(current: Dict[str, Any] | None, new: Dict[str, Any] | None) -> Dict[str, Any]:
-    merged: Dict[str, Any] = {}
-    if current:
-        merged.update(current)
+    # Always a fresh dict: the state value must not alias a node's return dict.
+    merged: Dict[str, Any] = dict(current) if current else {}
     if new:
         merged.update(new)
     return merged
@@ -42,6 +42,8 @@ from .prompts import (
     #IDEATOR_SYSTEM_PROMPT,
     #SENSE_LINE_INSTRUCTION,
     #TOOL_POLICY_PROMPT,
+    assemble_system_prompt,
+    get_fragment,
     get_locale,
 )
 from .report_loader import load_report, process_report
@@ -106,20 +108,43 @@ _yandex_tool = SearchTool(
 )
 
 
+_LOCALE_NAME = "ru"
 _LOCALE: Dict[str, Any] = {}
 _AGENT_TEXT: Dict[str, str] = {}
-_PROMPT_FRAGMENTS: Dict[str, str] = {}
 _REGION_TEXT: Dict[str, str] = {}
 _PROMPTS: Dict[str, str] = {}
+# Per-locale static prompt heads. Every turn starts with the same bytes, so the provider's
+# prompt prefix cache can serve them; per-turn report data is appended after the head.
+_SENSE_PROMPT_HEAD = ""
+_IDEAS_PROMPT_HEAD = ""
 
 
 def set_locale(locale: str = "ru") -> None:
-    global _LOCALE, _AGENT_TEXT, _PROMPT_FRAGMENTS, _REGION_TEXT, _PROMPTS
+    global _LOCALE_NAME, _LOCALE, _AGENT_TEXT, _REGION_TEXT, _PROMPTS
+    global _SENSE_PROMPT_HEAD, _IDEAS_PROMPT_HEAD
+    _LOCALE_NAME = locale
     _LOCALE = get_locale(locale)
     _AGENT_TEXT = _LOCALE["agent"]
-    _PROMPT_FRAGMENTS = _LOCALE["prompt_fragments"]
     _REGION_TEXT = _LOCALE["regions"]
     _PROMPTS = _LOCALE["prompts"]
+    _SENSE_PROMPT_HEAD = "\n\n".join(
+        (
+            assemble_system_prompt(locale, think=True, search=False),
+            _PROMPTS["sense_line_instruction"],
+            _PROMPTS["fact_ref_hint"],
+            build_json_prompt(SenseLineResponse),
+            "",
+        )
+    )
+    _IDEAS_PROMPT_HEAD = "\n\n".join(
+        (
+            assemble_system_prompt(locale, think=True, search=True),
+            _PROMPTS["ideas_instruction"],
+            _PROMPTS["fact_ref_hint"],
+            build_json_prompt(IdeaListResponse),
+            "",
+        )
+    )
 
 
 set_locale()
@@ -200,12 +225,8 @@ def _fact_links_md(report: IdeatorReport, article_ids: List[int], limit: int = 5
                 relevance = _REGION_TEXT["relevance_unknown"]
             importance = art.norm_importance()
             links.append(
-                _AGENT_TEXT["fact_link_item"].format(
-                    title=art.display_title(),
-                    url=art.url,
-                    relevance=relevance,
-                    importance=importance,
-                )
+                _AGENT_TEXT["fact_link_item_pct"]
+                % (art.display_title(), art.url, relevance, importance)
             )
     return "\n".join(links)
 
@@ -223,12 +244,8 @@ def _fact_links_from_articles(articles: List[ArticleRecord], limit: int = 5) ->
                 relevance = _REGION_TEXT["relevance_unknown"]
             importance = art.norm_importance()
             links.append(
-                _AGENT_TEXT["fact_link_item"].format(
-                    title=art.display_title(),
-                    url=art.url,
-                    relevance=relevance,
-                    importance=importance,
-                )
+                _AGENT_TEXT["fact_link_item_pct"]
+                % (art.display_title(), art.url, relevance, importance)
             )
     return "\n".join(links)
 
@@ -272,29 +289,23 @@ def _build_sense_agent(model: BaseChatModel):
         articles = report.sorted_articles()[:80] if use_report else []
         existing_lines = state.get("sense_lines") or []
         prompt = (
-            _PROMPTS["ideator_system_prompt"]
-            + "\n"
-            + _PROMPTS["sense_line_instruction"]
-            + "\n"
-            + _PROMPTS["fact_ref_hint"]
-            + "\n\n"
-            + _PROMPT_FRAGMENTS["search_goal_line"].format(
+            _SENSE_PROMPT_HEAD
+            + get_fragment(_LOCALE_NAME, "search_goal_line",
                 search_goal=report.search_goal if use_report else ""
             )
-            + _PROMPT_FRAGMENTS["articles_stats_line"].format(
+            + get_fragment(_LOCALE_NAME, "articles_stats_line",
                 total=report.total_articles if use_report else 0,
                 count=len(articles),
             )
-            + _PROMPT_FRAGMENTS["articles_list_block"].format(
+            + get_fragment(_LOCALE_NAME, "articles_list_block",
                 articles=_format_articles(articles)
             )
         )
         if existing_lines:
-            prompt += _PROMPT_FRAGMENTS["existing_sense_lines_block"].format(
+            prompt += get_fragment(_LOCALE_NAME, "existing_sense_lines_block",
                 lines=_format_sense_lines(existing_lines)
             )
-        prompt += f"{build_json_prompt(SenseLineResponse)}"
-        return prompt + _PROMPTS["think_tool_policy_prompt"]
+        return prompt
 
     return create_agent(
         model=model,
@@ -318,26 +329,20 @@ def _build_ideas_agent(model: BaseChatModel):
             articles = report.filter_by_ids(filtered_ids)
         existing_ideas = state.get("ideas") or []
         prompt = (
-            _PROMPTS["ideator_system_prompt"]
-            + "\n"
-            + _PROMPTS["ideas_instruction"]
-            + "\n"
-            + _PROMPTS["fact_ref_hint"]
-            + "\n\n"
-            + _PROMPT_FRAGMENTS["active_sense_line_line"].format(
+            _IDEAS_PROMPT_HEAD
+            + get_fragment(_LOCALE_NAME, "active_sense_line_line",
                 line=state.get("selected_line_id", "")
             )
-            + _PROMPT_FRAGMENTS["articles_in_context_line"].format(count=len(articles))
-            + _PROMPT_FRAGMENTS["available_articles_block"].format(
+            + get_fragment(_LOCALE_NAME, "articles_in_context_line", count=len(articles))
+            + get_fragment(_LOCALE_NAME, "available_articles_block",
                 articles=_format_articles(articles)
             )
         )
         if existing_ideas:
-            prompt += _PROMPT_FRAGMENTS["existing_ideas_block"].format(
+            prompt += get_fragment(_LOCALE_NAME, "existing_ideas_block",
                 ideas=_format_ideas(existing_ideas)
             )
-        prompt += f"{build_json_prompt(IdeaListResponse)}"
-        return prompt + _PROMPTS["think_tool_policy_prompt"] + "\n\n" + _PROMPTS["search_tool_policy_prompt"]
+        return prompt
 
     return create_agent(
         model=model,
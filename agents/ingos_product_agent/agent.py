@@ -9,7 +9,7 @@ import config as cfg
 #os.environ["LANGSMITH_HIDE_OUTPUTS"] = "true"
 from typing import Annotated, Any, Dict, List, Optional, TypedDict
 
-from langgraph.graph.message import AnyMessage, add_messages
+from langgraph.graph.message import AnyMessage, add_messages, REMOVE_ALL_MESSAGES
 
 
 from langgraph.checkpoint.memory import MemorySaver
@@ -41,10 +41,15 @@ from ..utils import create_tool_node_with_fallback, show_graph, _print_event, _p
 from ..user_info import user_info
 from ..utils import ModelType
 from ..llm_utils import get_llm
-from .retrievers.retriever_utils import get_search_tool, reload_retrievers as reload_product_retrievers, get_chroma_vectore_store
+from .retrievers.retriever_utils import (
+    cached_vector_search,
+    get_search_tool,
+    reload_retrievers as reload_product_retrievers,
+    warm_chroma_vector_store,
+)
 from .retrievers.vector_store import VectorStore
 
-from ..palimpsest_sessions import PalimpsestSessionManager, PalimpsestSessionMiddleware
+from ..palimpsest_sessions import PalimpsestSessionManager, PalimpsestSessionMiddleware, content_is_reset
 
 import logging
 logging.basicConfig(
@@ -81,10 +86,7 @@ def _content_text(content: Any) -> str:
 
 
 def reset_or_run(state: ProductAgentState, config: RunnableConfig) -> str:
-    last_parts = _content_parts(state["messages"][-1].content)
-    if last_parts and last_parts[0].get("type") == "reset":
-        return "reset_memory"
-    if isinstance(state["messages"][-1].content, str) and state["messages"][-1].content.strip().lower() == "reset":
+    if content_is_reset(state["messages"][-1].content):
         return "reset_memory"
     else:
         return "default_agent"
@@ -93,10 +95,10 @@ def reset_memory(state: ProductAgentState) -> ProductAgentState:
     """
     Delete every message currently stored in the thread’s state.
     """
-    all_msg_ids = [m.id for m in state["messages"]]
-    # Returning RemoveMessage instances instructs the reducer to delete them
+    # A single REMOVE_ALL_MESSAGES sentinel makes the reducer drop the whole channel
     return {
-        "messages": [RemoveMessage(id=mid) for mid in all_msg_ids],
+        "messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES)],
+        "prefetch_message_ids": [],
         "verification_result": "",
         "verification_reason": ""
     }
@@ -151,7 +153,8 @@ def initialize_agent(
     search_kb = get_search_tool(product)
     vector_docs_path = os.getenv("INGOS_VECTOR_DOCS_PATH", "./data/docs")
     vector_store_path = os.getenv("INGOS_VECTOR_STORE_PATH", "./data/vector_store")
-    vector_store = get_chroma_vectore_store(docs_path=vector_docs_path, vector_store_path=vector_store_path)
+    # Loads in the background; the first prefetch waits for it only if it is still running.
+    warm_chroma_vector_store(docs_path=vector_docs_path, vector_store_path=vector_store_path)
     search_tools = [
         search_kb,
     ]
@@ -188,70 +191,67 @@ def initialize_agent(
     def with_validator(agent_runnable, validator):
         return agent_runnable | RunnableLambda(validator)
 
-    def prefetch_context(state: ProductAgentState) -> ProductAgentState:
+    def prefetch_context(state: ProductAgentState) -> Dict[str, Any]:
+        # Runs in parallel with fetch_user_info, so it returns only its own channel update.
         if prefetch_top_k <= 0:
-            return state
+            return {}
 
-        messages = list(state["messages"])
+        messages = state["messages"]
         if not messages:
-            return state
-
-        # Remove any previously injected prefetch messages to avoid duplication.
-        messages = [
-            msg
-            for msg in messages
-            if not (
-                isinstance(msg, SystemMessage)
-                and isinstance(getattr(msg, "additional_kwargs", {}), dict)
-                and msg.additional_kwargs.get("source") == "vector_prefetch"
-            )
-        ]
-
-        last_user_idx = next(
-            (idx for idx in range(len(messages) - 1, -1, -1) if messages[idx].type == "human"),
-            None,
-        )
-        if last_user_idx is None:
-            state["messages"] = messages
-            return state
+            return {}
+
+        # Drop the previous turn's prefetch messages; ids are tracked so no content scan is needed.
+        removals: List[RemoveMessage] = []
+        stale_ids = state.get("prefetch_message_ids") or []
+        if stale_ids:
+            stale = set(stale_ids)
+            # Guardrails may have cleared the history since, and removing a missing id is an error.
+            removals = [RemoveMessage(id=msg.id) for msg in messages if msg.id in stale]
+        cleanup = {"messages": removals, "prefetch_message_ids": []} if stale_ids else {}
+
+        # The new turn's message is normally the last one, so this stops at the tail.
+        last_user = next((msg for msg in reversed(messages) if msg.type == "human"), None)
+        if last_user is None:
+            return cleanup
 
-        last_user = messages[last_user_idx]
         query = _content_text(getattr(last_user, "content", []))
         if not query:
             query = f"information about product {product}"
 
         try:
-            docs = vector_store.search(query=query, n_results=prefetch_top_k, product=product)
+            # Same Future on every turn; a failed warm-up is resubmitted here.
+            vector_store = warm_chroma_vector_store(vector_docs_path, vector_store_path).result(timeout=30)
+            docs = cached_vector_search(vector_store, query, prefetch_top_k, product)
         except Exception as exc:
             logging.warning("Vector prefetch failed for product %s: %s", product, exc)
-            state["messages"] = messages
-            return state
+            return cleanup
 
         if not docs:
-            state["messages"] = messages
-            return state
+            return cleanup
 
         context_chunks = "\n\n".join(
             doc.page_content for doc in docs if getattr(doc, "page_content", "").strip()
         ).strip()
         if not context_chunks:
-            state["messages"] = messages
-            return state
+            return cleanup
 
         context_message = SystemMessage(
             content=f"Prefetched knowledge base context:\n{context_chunks}",
             additional_kwargs={"source": "vector_prefetch", "doc_count": len(docs)},
+            id=str(uuid.uuid4()),
         )
 
-        updated_messages = messages[:last_user_idx] + [context_message] + messages[last_user_idx:]
-        state["messages"] = updated_messages
         logging.debug(
             "Prefetched %d documents for product=%s using query='%s'",
             len(docs),
             product,
             query[:120],
         )
-        return state
+        return {
+            # add_messages appends new ids, so the context lands right after the user's message.
+            "messages": [*removals, context_message],
+            "prefetch_message_ids": [context_message.id],
+        }
 
     default_agent = with_validator(
         create_agent(
@@ -280,18 +280,21 @@ def initialize_agent(
     builder.add_node("prefetch_context", prefetch_context)
     builder.add_node("default_agent", default_agent)
 
+    def route_turn(state: ProductAgentState, config: RunnableConfig):
+        if reset_or_run(state, config) == "reset_memory":
+            # user_info and the reset write disjoint channels, so they run side by side.
+            return ["fetch_user_info", "reset_memory"]
+        # The prefetch only reads messages, so it overlaps with the user-info lookup.
+        return ["fetch_user_info", "prefetch_context"]
+
     # Define edges
-    builder.add_edge(START, "fetch_user_info")
     builder.add_conditional_edges(
-        "fetch_user_info",
-        reset_or_run,
-        {
-            "reset_memory": "reset_memory",
-            "default_agent": "prefetch_context",
-        }
+        START,
+        route_turn,
+        ["reset_memory", "fetch_user_info", "prefetch_context"],
     )
     builder.add_edge("reset_memory", END)
-    builder.add_edge("prefetch_context", "default_agent")
+    builder.add_edge(["fetch_user_info", "prefetch_context"], "default_agent")
     agent = builder.compile(name="ingos_product_agent", checkpointer=memory).with_config({"callbacks": callback_handlers})
 
     agent_key = f"product_{product}"
@@ -5,6 +5,10 @@ import logging
 
 from typing import TYPE_CHECKING, List, Any, Optional, Dict, Tuple, TypedDict, Annotated
 import os, torch, pickle
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from functools import lru_cache
 import threading
 
@@ -18,7 +22,11 @@ from langchain_classic.storage import InMemoryByteStore
 from langchain_classic.docstore.document import Document
 from langchain_core.tools import tool
 
-from ...retrievers.cross_encoder_reranker_with_score import CrossEncoderRerankerWithScores, TournamentCrossEncoderReranker
+from ...retrievers.cross_encoder_reranker_with_score import (
+    CoalescingCrossEncoder,
+    CrossEncoderRerankerWithScores,
+    TournamentCrossEncoderReranker,
+)
 from ...retrievers.utils.models_builder import (
     getEmbeddingModel,
     getRerankerModel,
@@ -27,6 +35,11 @@ from ...retrievers.utils.load_common_retrievers import (
     load_vectorstore
 )
 
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency guard
+    tiktoken = None
+
 from .vector_store import VectorStore
 
 from ...palimpsest_sessions import anonymize_with_session
@@ -35,6 +48,8 @@ import config
 #_faiss_reranker_retriever: Optional[TournamentCrossEncoderReranker] = None
 
 _MAX_RETRIEVALS=5
+# Upper bound for the context search_kb hands to the anonymizer and the LLM
+_SEARCH_RESULT_MAX_TOKENS = 3000
 
 if TYPE_CHECKING:
     from palimpsest import Palimpsest
@@ -42,6 +57,13 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=1)
+def _get_shared_reranker_model() -> CoalescingCrossEncoder:
+    # One batching front for all products, so concurrent search_kb calls share forward passes.
+    return CoalescingCrossEncoder(getRerankerModel())
+
+
 @lru_cache(maxsize=64)
 def buildFAISSRetriever(product: str = "default")-> ContextualCompressionRetriever:
     #global _faiss_reranker_retriever
@@ -64,7 +86,7 @@ def buildFAISSRetriever(product: str = "default")-> ContextualCompressionRetriev
         #    search_kwargs={"k": _MAX_RETRIEVALS},
         #)
         #multi_retriever.docstore.mset(list(zip(doc_ids, documents)))
-        reranker_model = getRerankerModel()
+        reranker_model = _get_shared_reranker_model()
         #reranker = CrossEncoderRerankerWithScores(
         #    model=reranker_model, 
         #   top_n=_MAX_RETRIEVALS, 
@@ -91,8 +113,10 @@ def buildFAISSRetriever(product: str = "default")-> ContextualCompressionRetriev
 
 def get_retriever_faiss(product: str = "default"):
     MAX_RETRIEVALS = 3
-    retriever = buildFAISSRetriever(product)
+    buildFAISSRetriever(product)
     def search(query: str) -> List[Document]:
+        # Resolved per call (a cache hit) so a KB reload reaches tools that are already built.
+        retriever = buildFAISSRetriever(product)
         try:
             result = retriever.invoke(
                 query, 
@@ -143,6 +167,77 @@ def get_chroma_vectore_store(
         return instance
 
 
+_PREFETCH_TTL_SECONDS = 60.0
+_PREFETCH_CACHE_SIZE = 1024
+_prefetch_cache: "OrderedDict[Tuple[Any, ...], Tuple[float, List[Document]]]" = OrderedDict()
+_prefetch_inflight: Dict[Tuple[Any, ...], Future] = {}
+_prefetch_lock = threading.Lock()
+
+
+def cached_vector_search(
+    vector_store: VectorStore,
+    query: str,
+    n_results: int,
+    product: str = "default",
+) -> List[Document]:
+    """VectorStore.search behind a short TTL cache; concurrent identical queries share one search."""
+    key = (
+        vector_store,
+        product,
+        n_results,
+        hashlib.blake2b(query.encode("utf-8"), digest_size=16).digest(),
+    )
+    with _prefetch_lock:
+        cached = _prefetch_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            _prefetch_cache.move_to_end(key)
+            return list(cached[1])
+        future = _prefetch_inflight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _prefetch_inflight[key] = future
+    if not owner:
+        return list(future.result())
+
+    try:
+        docs = vector_store.search(query=query, n_results=n_results, product=product)
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    finally:
+        with _prefetch_lock:
+            _prefetch_inflight.pop(key, None)
+    future.set_result(docs)
+    # VectorStore.search swallows its own errors and returns [], so empty results are not cached.
+    if docs:
+        with _prefetch_lock:
+            _prefetch_cache[key] = (time.monotonic() + _PREFETCH_TTL_SECONDS, docs)
+            _prefetch_cache.move_to_end(key)
+            while len(_prefetch_cache) > _PREFETCH_CACHE_SIZE:
+                _prefetch_cache.popitem(last=False)
+    return list(docs)
+
+
+_vector_store_warmup = ThreadPoolExecutor(max_workers=2, thread_name_prefix="vector-store-warmup")
+_vector_store_futures: Dict[Tuple[str, str], Future] = {}
+_vector_store_futures_lock = threading.Lock()
+
+
+def warm_chroma_vector_store(
+    docs_path: str = "./data/docs",
+    vector_store_path: str = "./data/vector_store",
+) -> Future:
+    """Start (or join) a background load of the VectorStore; the Future resolves to the shared instance."""
+    key = _vector_store_key(docs_path, vector_store_path)
+    with _vector_store_futures_lock:
+        future = _vector_store_futures.get(key)
+        if future is None or (future.done() and future.exception() is not None):
+            future = _vector_store_warmup.submit(get_chroma_vectore_store, docs_path, vector_store_path)
+            _vector_store_futures[key] = future
+        return future
+
+
 def get_retriever(product: str = "default"):
     MAX_RETRIEVALS = 3
     retriever  = get_chroma_vectore_store(docs_path="./data/docs", vector_store_path="./data/vector_store")
@@ -158,10 +253,33 @@ def get_retriever(product: str = "default"):
 
 
 
-#@lru_cache(maxsize=64)
+@lru_cache(maxsize=1)
+def _token_encoding():
+    return tiktoken.get_encoding("o200k_base") if tiktoken is not None else None
+
+
+def _join_within_budget(docs: List[Document], max_tokens: int = _SEARCH_RESULT_MAX_TOKENS) -> str:
+    """Join ranked docs until the token budget is spent; the top document is always kept."""
+    encoding = _token_encoding()
+    chunks: List[str] = []
+    used = 0
+    for doc in docs:
+        text = doc.page_content
+        cost = len(encoding.encode(text, disallowed_special=())) if encoding is not None else len(text) // 4
+        if chunks and used + cost > max_tokens:
+            break
+        chunks.append(text)
+        used += cost
+    return "\n\n".join(chunks)
+
+
 def get_search_tool(product: str = "default", anonymizer: Palimpsest = None):
-    product = product
-    if config.INGOS_RETRIEVER == "faiss":
+    return _build_search_tool(product, anonymizer, config.INGOS_RETRIEVER)
+
+
+@lru_cache(maxsize=64)
+def _build_search_tool(product: str, anonymizer: Palimpsest | None, retriever_kind: str):
+    if retriever_kind == "faiss":
         search = get_retriever_faiss(product)
     else:
         search = get_retriever(product)
@@ -176,7 +294,7 @@ def get_search_tool(product: str = "default", anonymizer: Palimpsest = None):
         print(f"search for product:{product}")
         found_docs = search(query)
         if found_docs:
-            result = "\n\n".join([doc.page_content for doc in found_docs[:30]])
+            result = _join_within_budget(found_docs)
             if anonymizer:
                 result = anonymize_with_session(anonymizer, result)
             return result
@@ -190,3 +308,6 @@ def reload_retrievers(context: "KBReloadContext | None" = None) -> None:
     reason = context.reason if context else "unspecified"
     logger.info("Reloading product retrievers (reason=%s)", reason)
     buildFAISSRetriever.cache_clear()
+    _build_search_tool.cache_clear()
+    with _prefetch_lock:
+        _prefetch_cache.clear()
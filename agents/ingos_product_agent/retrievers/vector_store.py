@@ -1,26 +1,390 @@
+import asyncio
+import csv
+import io
 import os
 import shutil
 import stat
 import tempfile
+import threading
 import time
 import json
 import hashlib
+import mmap
+import multiprocessing
 import sqlite3
-
-import pandas as pd
-
-from typing import List, Dict, Optional, Callable, Any  # + Callable
+import uuid
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from functools import lru_cache
+
+import numpy as np
+
+from typing import List, Dict, Optional, Callable, Any, Iterable, Iterator, Tuple  # + Callable
 from langchain_classic.text_splitter import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
 # from langchain.vectorstores import Chroma
 from langchain_classic.schema import Document
-from langchain_community.document_loaders import TextLoader, DirectoryLoader
 #from langchain_community.vectorstores import Chroma
 from langchain_chroma import Chroma
 from filelock import FileLock
 from chromadb.config import Settings  # added
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency guard
+    tiktoken = None
+
+try:
+    import blake3
+except ImportError:  # pragma: no cover - optional dependency guard
+    blake3 = None
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - optional dependency guard
+    psutil = None
+
+try:
+    import openpyxl
+except ImportError:  # pragma: no cover - optional dependency guard
+    openpyxl = None
+
 #from settings import settings  # добавлено
 
+# Лимиты одного запроса к OpenAI embeddings (не более 2048 входов и ~300k токенов)
+_EMBED_BATCH_MAX_ITEMS = 2048
+_EMBED_BATCH_MAX_TOKENS = 250_000
+
+# Расширения файлов-источников в docs_path
+_SOURCE_EXTENSIONS = (".txt", ".docx", ".xlsx", ".pdf")
+
+# Защищает переключение директорий хранилища от одновременных пересборок в процессе
+_STORE_SWAP_LOCK = threading.Lock()
+
+
+# Настройки окружения читаются при каждом вызове, чтобы изменения os.environ учитывались
+def _env_bool(key: str, default: str) -> bool:
+    return str(os.getenv(key, default)).lower() in ("1", "true", "yes")
+
+
+def _env_int(key: str, default: int) -> int:
+    return int(os.getenv(key, str(default)))
+
+
+def _content_hash(data: "bytes | mmap.mmap") -> str:
+    """Короткий (16 байт) хеш содержимого для дедупликации: BLAKE3, либо BLAKE2b из stdlib."""
+    if blake3 is not None:
+        return blake3.blake3(data).hexdigest(length=16)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _is_rebuild_temp_dir(name: str) -> bool:
+    """Временный каталог пересборки хранилища (.<имя>_new_<ts>, см. safe_rebuild)."""
+    _, sep, ts = name.rpartition("_new_")
+    return name.startswith(".") and bool(sep) and ts.isdigit()
+
+
+def _has_hidden_part(path: str, root: str) -> bool:
+    """Есть ли в пути относительно root скрытый файл или каталог (начинается с точки)."""
+    return any(part.startswith(".") for part in os.path.relpath(path, root).split(os.sep))
+
+
+def _iter_files(
+    directory: str,
+    suffixes: Tuple[str, ...],
+    include_hidden: bool = True,
+) -> Iterator[os.DirEntry]:
+    """Рекурсивно обходит directory через os.scandir и отдаёт файлы с нужными окончаниями.
+    Скрытые файлы и каталоги отдаются, как в os.walk, если не передан include_hidden=False;
+    временные каталоги пересборки хранилища пропускаются всегда.
+    """
+    try:
+        entries = list(os.scandir(directory))
+    except OSError as e:
+        print(f"Предупреждение: не удалось прочитать каталог '{directory}': {e}")
+        return
+    for entry in entries:
+        if not include_hidden and entry.name.startswith("."):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            if not _is_rebuild_temp_dir(entry.name):
+                yield from _iter_files(entry.path, suffixes, include_hidden)
+        elif entry.name.lower().endswith(suffixes) and entry.is_file():
+            yield entry
+
+
+@lru_cache(maxsize=4096)
+def _is_learning_source(source: Optional[str]) -> bool:
+    """Файл режима обучения: имя файла или его каталога начинается с learn.
+    Кешируется: листы одного Excel и чанки одного файла делят путь-источник.
+    """
+    if not source:
+        return False
+    if os.path.basename(source).lower().startswith("learn"):
+        return True
+    return os.path.basename(os.path.dirname(source)).lower().startswith("learn")
+
+
+def _group_paths_by_extension(paths: Iterable[str]) -> Dict[str, List[str]]:
+    """Раскладывает пути файлов-источников по расширениям (в нижнем регистре), пути сортируются."""
+    paths_by_ext: Dict[str, List[str]] = {ext: [] for ext in _SOURCE_EXTENSIONS}
+    for path in paths:
+        ext = os.path.splitext(path)[1].lower()
+        if ext in paths_by_ext:
+            paths_by_ext[ext].append(path)
+    for ext_paths in paths_by_ext.values():
+        ext_paths.sort()
+    return paths_by_ext
+
+
+def _read_text_file(path: str) -> Optional[Tuple[str, str]]:
+    """Читает текстовый файл в UTF-8 через mmap и возвращает (текст, хеш содержимого).
+    Хеш считается прямо по отображённым байтам, без промежуточной копии.
+    При ошибке печатает предупреждение и возвращает None.
+    """
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return "", _content_hash(b"")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                text = str(mapped, "utf-8")
+                if "\r" not in text:
+                    return text, _content_hash(mapped)
+        # Как при чтении в текстовом режиме: \r\n и \r превращаются в \n
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text, _content_hash(text.encode("utf-8"))
+    except Exception as e:
+        print(f"Предупреждение: не удалось прочитать '{path}': {e}")
+        return None
+
+
+def _docx_to_text(file_path: str) -> str:
+    """Извлекает непустые абзацы .docx через python-docx."""
+    from docx import Document
+
+    doc = Document(file_path)
+    return '\n'.join(text for paragraph in doc.paragraphs if (text := paragraph.text).strip())
+
+
+# === Excel helpers ===
+# Функции уровня модуля без состояния VectorStore, чтобы разбор Excel можно было отдать в пул процессов.
+# Одиночный \r — тоже перевод строки; str.translate заменяет всё за один проход
+_MARKDOWN_CELL_TRANSLATION = str.maketrans({"\r": "<br>", "\n": "<br>", "|": "\\|"})
+
+
+def _sanitize_markdown_cell(value: Optional[str]) -> str:
+    """Подготавливает значение ячейки к безопасному отображению в Markdown-таблице."""
+    if value is None:
+        return ""
+    return str(value).replace("\r\n", "\n").strip().translate(_MARKDOWN_CELL_TRANSLATION)
+
+
+def _rows_to_markdown(headers: List[str], rows: List[List[str]]) -> str:
+    """Формирует Markdown-таблицу из заголовков и строк листа без внешних зависимостей."""
+    header_cells = [
+        _sanitize_markdown_cell(col if col else f"Column {idx + 1}")
+        for idx, col in enumerate(headers)
+    ]
+    lines = [
+        "| " + " | ".join(header_cells) + " |",
+        "| " + " | ".join("---" for _ in header_cells) + " |",
+    ]
+    lines.extend("| " + " | ".join(map(_sanitize_markdown_cell, row)) + " |" for row in rows)
+    return "\n".join(lines)
+
+
+def _rows_to_bullet(headers: List[str], rows: List[List[str]]) -> str:
+    """Формирует компактное описание строк таблицы в виде маркированного списка."""
+    blocks = []
+    for idx, row in enumerate(rows, start=1):
+        items = "".join(
+            f"\n  - {column}: " + value.replace("\r\n", " ").replace("\n", " ")
+            for column, value in zip(headers, map(str.strip, row))
+            if value
+        )
+        blocks.append(f"Строка {idx}:{items}")
+    return "\n\n".join(blocks)
+
+
+def _rows_to_csv(headers: List[str], rows: List[List[str]], sep: str = ",") -> str:
+    """Возвращает CSV/TSV-представление таблицы (кавычки по минимуму, как в pandas.to_csv)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=sep, lineterminator="\n")
+    writer.writerow(headers)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def _rows_to_tsv(headers: List[str], rows: List[List[str]]) -> str:
+    """Возвращает TSV-представление таблицы (исторический формат по умолчанию)."""
+    return _rows_to_csv(headers, rows, sep="\t")
+
+
+def _format_excel_table(
+    headers: List[str],
+    rows: List[List[str]],
+    excel_output_format: str,
+    messages: List[str],
+) -> Tuple[str, str]:
+    """Форматирует таблицу согласно настройкам и возвращает текст + применённый формат.
+    Предупреждения складываются в messages.
+    """
+    requested = (excel_output_format or "markdown").lower()
+    aliases = {
+        "md": "markdown",
+        "table": "markdown",
+        "list": "bullet",
+    }
+    fmt = aliases.get(requested, requested)
+
+    try:
+        if fmt == "markdown":
+            return _rows_to_markdown(headers, rows), "markdown"
+        if fmt == "bullet":
+            return _rows_to_bullet(headers, rows), "bullet"
+        if fmt == "csv":
+            return _rows_to_csv(headers, rows), "csv"
+        if fmt == "tsv":
+            return _rows_to_tsv(headers, rows), "tsv"
+        messages.append(f"[norm] ⚠️ Неизвестный формат Excel '{requested}', используем TSV")
+        return _rows_to_tsv(headers, rows), "tsv"
+    except Exception as e:
+        messages.append(
+            f"[norm] ⚠️ Ошибка форматирования Excel ({fmt}): {e}. Используем TSV"
+        )
+        return _rows_to_tsv(headers, rows), "tsv"
+
+
+def _excel_cell_to_str(value: Any) -> str:
+    """Приводит значение ячейки к строке так же, как pandas.read_excel(dtype=str)."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _dedup_excel_headers(headers: List[str]) -> List[str]:
+    """Переименовывает повторяющиеся заголовки так же, как pandas: A, A.1, A.2."""
+    counts: Dict[str, int] = {}
+    result: List[str] = []
+    for name in headers:
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            count = counts.get(name, 0)
+        result.append(name)
+        counts[name] = count + 1
+    return result
+
+
+def _read_excel_sheet(worksheet: Any, max_rows: int) -> Tuple[List[str], List[List[str]], int]:
+    """Потоково читает заголовок и не более max_rows строк листа.
+    Возвращает (заголовки, строки, общее число строк данных).
+    """
+    headers: Optional[List[str]] = None
+    rows: List[List[str]] = []
+    seen = 0
+    total_rows = 0
+    for raw in worksheet.iter_rows(values_only=True):
+        if headers is None:
+            headers = [_excel_cell_to_str(value) for value in raw]
+            continue
+        # Строки сверх max_rows только считаем: worksheet.max_row в режиме read_only ненадёжен
+        seen += 1
+        if any(value is not None and value != "" for value in raw):
+            total_rows = seen
+        if len(rows) < max_rows:
+            values = [_excel_cell_to_str(value) for value in raw]
+            while values and not values[-1]:
+                values.pop()
+            rows.append(values)
+    headers = headers or []
+    while headers and not headers[-1]:
+        headers.pop()
+    # Как и pandas, отбрасываем пустые строки в конце листа
+    del rows[total_rows:]
+
+    width = max([len(headers), *(len(row) for row in rows)])
+    headers = _dedup_excel_headers(
+        [
+            name if name else f"Unnamed: {idx}"
+            for idx, name in enumerate(headers + [""] * (width - len(headers)))
+        ]
+    )
+    rows = [row + [""] * (width - len(row)) for row in rows]
+    return headers, rows, total_rows
+
+
+def _excel_file_to_records(
+    file_path: str,
+    max_rows: int,
+    excel_output_format: str,
+) -> Tuple[List[Tuple[str, Dict[str, Any]]], List[str]]:
+    """Конвертирует .xlsx в пары (текст, метаданные) по одному на лист + сообщения о прогрессе.
+    Возвращает простые типы (не Document), чтобы результат дёшево передавался между процессами.
+    """
+    records: List[Tuple[str, Dict[str, Any]]] = []
+    messages: List[str] = []
+    if openpyxl is None:
+        print("Предупреждение: openpyxl не установлен, пропускаем Excel")
+        return records, messages
+
+    try:
+        # read_only: листы читаются потоково, без построения графа ячеек;
+        # data_only: значения формул берём из кеша, как pandas
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    except Exception as e:
+        print(f"Предупреждение: ошибка чтения Excel '{file_path}': {e}")
+        return records, messages
+
+    try:
+        messages.append(
+            f"Загрузка Excel: {os.path.basename(file_path)} | листов: {len(workbook.worksheets)}"
+        )
+        for worksheet in workbook.worksheets:
+            sheet_name = worksheet.title
+            # Ограничим строки, чтобы не раздувать документ
+            headers, rows, rows_before = _read_excel_sheet(worksheet, max_rows)
+            table_text, used_format = _format_excel_table(
+                headers, rows, excel_output_format, messages
+            )
+            format_label = {
+                "markdown": "Markdown",
+                "bullet": "bullet list",
+                "csv": "CSV",
+                "tsv": "TSV",
+            }.get(used_format, used_format)
+            header = (
+                f"Источник: {os.path.basename(file_path)} | Лист: {sheet_name} | Строк: {len(rows)}"
+                + (f" (обрезано из {rows_before})" if rows_before > len(rows) else "")
+                + f" | Формат таблицы: {format_label}"
+            )
+            records.append(
+                (
+                    header + "\n\n" + table_text,
+                    {
+                        "source": file_path,
+                        "sheet_name": str(sheet_name),
+                        "rows": len(rows),
+                        "excel": True,
+                    },
+                )
+            )
+        return records, messages
+    except Exception as e:
+        print(f"Предупреждение: ошибка чтения Excel '{file_path}': {e}")
+        return records, messages
+    finally:
+        workbook.close()
+
+
 class VectorStore:
     def __init__(
         self,
@@ -59,20 +423,18 @@ class VectorStore:
         self.progress_callback: Optional[Callable[[str], None]] = None
 
         # Параметры обработки Excel
-        self.excel_max_rows = int(os.getenv("EXCEL_MAX_ROWS", "2000"))
+        self.excel_max_rows = _env_int("EXCEL_MAX_ROWS", 2000)
         self.excel_output_format = (
             os.getenv("EXCEL_NORMALIZED_FORMAT", "markdown") or "markdown"
         ).strip().lower()
 
         # Сохранение копий исходных документов
-        self.save_normalized_docs = str(os.getenv("SAVE_NORMALIZED_DOCS", "false")).lower() in ("1", "true", "yes")
-        self.save_only_changed = str(os.getenv("SAVE_ONLY_CHANGED", "true")).lower() in ("1", "true", "yes")
+        self.save_normalized_docs = _env_bool("SAVE_NORMALIZED_DOCS", "false")
+        self.save_only_changed = _env_bool("SAVE_ONLY_CHANGED", "true")
         normalized_root = os.getenv("NORMALIZED_OUTPUT_DIR", "./data/normalized")
         self.normalized_base_dir = os.path.abspath(normalized_root)
         self.normalized_output_dir = self._resolve_normalized_output_dir()
-        self.include_normalized_docs = str(
-            os.getenv("INCLUDE_NORMALIZED_DOCS", "true")
-        ).lower() in ("1", "true", "yes")
+        self.include_normalized_docs = _env_bool("INCLUDE_NORMALIZED_DOCS", "true")
         if self.save_normalized_docs or self.include_normalized_docs:
             try:
                 os.makedirs(self.normalized_output_dir, exist_ok=True)
@@ -99,8 +461,11 @@ class VectorStore:
         # Инициализация эмбеддингов
         self.embeddings = OpenAIEmbeddings(
             model="text-embedding-3-large",
-            openai_api_key=self.openai_api_key
+            openai_api_key=self.openai_api_key,
+            chunk_size=_EMBED_BATCH_MAX_ITEMS,
         )
+        # Сколько батчей эмбеддингов отправляем в OpenAI одновременно
+        self.embedding_concurrency = max(1, _env_int("EMBEDDING_CONCURRENCY", 8))
 
         # Инициализация сплиттера
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -111,6 +476,8 @@ class VectorStore:
         )
 
         self.vectorstore = None
+        # Хеши текстовых файлов, посчитанные при чтении (source -> hash)
+        self._text_file_hashes: Dict[str, str] = {}
 
         # Создаем директории с правильными правами
         self._ensure_directories()
@@ -284,13 +651,7 @@ class VectorStore:
 
     def _is_learning_source(self, source: Optional[str]) -> bool:
         """Определяет, относится ли путь к файлу режима обучения (начинается с learn)."""
-        if not source:
-            return False
-        base_name = os.path.basename(source).lower()
-        if base_name.startswith("learn"):
-            return True
-        parent = os.path.basename(os.path.dirname(source)).lower()
-        return parent.startswith("learn")
+        return _is_learning_source(source)
 
     def _mark_learning_documents(self, documents: List[Document]) -> None:
         """Помечает документы режима обучения в метаданных."""
@@ -334,147 +695,58 @@ class VectorStore:
                 f"Нет прав на запись в директорию {directory}{hint}: {exc}"
             ) from exc
 
-    # === Excel helpers ===
-    def _sanitize_markdown_cell(self, value: Optional[str]) -> str:
-        """Подготавливает значение ячейки к безопасному отображению в Markdown-таблице."""
-        if value is None:
-            return ""
-        sanitized = str(value)
-        sanitized = sanitized.replace("\r\n", "\n").replace("\r", "\n").strip()
-        sanitized = sanitized.replace("|", "\\|")
-        return sanitized.replace("\n", "<br>")
-
-    def _df_to_markdown(self, df: "pd.DataFrame") -> str:
-        """Формирует Markdown-таблицу из DataFrame без внешних зависимостей."""
-        safe_df = df.fillna("")
-        headers = [
-            self._sanitize_markdown_cell(str(col) if str(col) else f"Column {idx + 1}")
-            for idx, col in enumerate(safe_df.columns)
-        ]
-        lines = [
-            "| " + " | ".join(headers) + " |",
-            "| " + " | ".join("---" for _ in headers) + " |",
-        ]
-        for _, row in safe_df.iterrows():
-            cells = [self._sanitize_markdown_cell(row[col]) for col in safe_df.columns]
-            lines.append("| " + " | ".join(cells) + " |")
-        return "\n".join(lines)
-
-    def _df_to_bullet(self, df: "pd.DataFrame") -> str:
-        """Формирует компактное описание строк таблицы в виде маркированного списка."""
-        safe_df = df.fillna("")
-        records = safe_df.to_dict(orient="records")
-        lines = []
-        for idx, record in enumerate(records, start=1):
-            lines.append(f"Строка {idx}:")
-            for column in safe_df.columns:
-                value = str(record.get(column, "")).strip()
-                if not value:
-                    continue
-                value = value.replace("\r\n", " ").replace("\n", " ")
-                lines.append(f"  - {column}: {value}")
-            lines.append("")
-        return "\n".join(lines).strip()
-
-    def _df_to_tsv(self, df: "pd.DataFrame") -> str:
-        """Возвращает TSV-представление таблицы (исторический формат по умолчанию)."""
-        return df.to_csv(sep="\t", index=False)
-
-    def _format_excel_table(self, df: "pd.DataFrame") -> (str, str):
-        """Форматирует таблицу согласно настройкам и возвращает текст + применённый формат."""
-        requested = (self.excel_output_format or "markdown").lower()
-        aliases = {
-            "md": "markdown",
-            "table": "markdown",
-            "list": "bullet",
-        }
-        fmt = aliases.get(requested, requested)
-
-        try:
-            if fmt == "markdown":
-                return self._df_to_markdown(df), "markdown"
-            if fmt == "bullet":
-                return self._df_to_bullet(df), "bullet"
-            if fmt == "csv":
-                return df.to_csv(index=False), "csv"
-            if fmt == "tsv":
-                return self._df_to_tsv(df), "tsv"
-            self._notify(f"[norm] ⚠️ Неизвестный формат Excel '{requested}', используем TSV")
-            return self._df_to_tsv(df), "tsv"
-        except Exception as e:
-            self._notify(
-                f"[norm] ⚠️ Ошибка форматирования Excel ({fmt}): {e}. Используем TSV"
-            )
-            return self._df_to_tsv(df), "tsv"
-
+    # === Excel ===
     def _excel_to_text(self, file_path: str) -> List[Document]:
-        """Конвертирует .xlsx в список Document (по одному на лист).
-        Текст формируется как простой CSV/TSV без индексов, ограничиваем кол-во строк.
+        """Конвертирует .xlsx в список Document (по одному на лист)."""
+        records, messages = _excel_file_to_records(
+            file_path, self.excel_max_rows, self.excel_output_format
+        )
+        for msg in messages:
+            self._notify(msg)
+        return [Document(page_content=text, metadata=metadata) for text, metadata in records]
+
+    def _load_excel_documents(self, paths: List[str]) -> List[Document]:
+        """Загрузка .xlsx-файлов из списка путей.
+        Разбор openpyxl держит GIL, поэтому файлы параллелятся пулом процессов.
+        Процессы запускаются через spawn: fork процесса с фоновыми потоками
+        сервера может зависнуть.
         """
-        docs: List[Document] = []
-        try:
-            import pandas as pd  # импорт внутри функции, чтобы не падать без pandas
-        except Exception as e:
-            print(f"Предупреждение: pandas не установлен, пропускаем Excel: {e}")
-            return docs
-
-        try:
-            # Читаем все листы как строки (для устойчивости к типам)
-            xls = pd.read_excel(file_path, sheet_name=None, dtype=str, engine="openpyxl")
-            total_sheets = len(xls)
-            self._notify(f"Загрузка Excel: {os.path.basename(file_path)} | листов: {total_sheets}")
-            for sheet_name, df in xls.items():
-                if df is None:
-                    continue
-                # Нормализуем NaN
-                df = df.fillna("")
-                # Ограничим строки, чтобы не раздувать документ
-                max_rows = self.excel_max_rows
-                rows_before = len(df)
-                if rows_before > max_rows:
-                    df = df.head(max_rows)
-                table_text, used_format = self._format_excel_table(df)
-                format_label = {
-                    "markdown": "Markdown",
-                    "bullet": "bullet list",
-                    "csv": "CSV",
-                    "tsv": "TSV",
-                }.get(used_format, used_format)
-                header = (
-                    f"Источник: {os.path.basename(file_path)} | Лист: {sheet_name} | Строк: {len(df)}"
-                    + (f" (обрезано из {rows_before})" if rows_before > len(df) else "")
-                    + f" | Формат таблицы: {format_label}"
-                )
-                full_text = header + "\n\n" + table_text
-                docs.append(
-                    Document(
-                        page_content=full_text,
-                        metadata={
-                            "source": file_path,
-                            "sheet_name": str(sheet_name),
-                            "rows": len(df),
-                            "excel": True,
-                        },
-                    )
-                )
-            return docs
-        except Exception as e:
-            print(f"Предупреждение: ошибка чтения Excel '{file_path}': {e}")
-            return docs
+        results: Dict[str, List[Document]] = {}
+        if len(paths) > 1:
+            try:
+                workers = min(len(paths), os.cpu_count() or 1)
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                ) as pool:
+                    futures = {
+                        pool.submit(
+                            _excel_file_to_records,
+                            path,
+                            self.excel_max_rows,
+                            self.excel_output_format,
+                        ): path
+                        for path in paths
+                    }
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        path = futures[future]
+                        records, messages = future.result()
+                        for msg in messages:
+                            self._notify(msg)
+                        results[path] = [
+                            Document(page_content=text, metadata=metadata)
+                            for text, metadata in records
+                        ]
+                        self._notify(f"Excel: обработано файлов {done}/{len(paths)}")
+            except Exception as e:
+                print(f"Предупреждение: параллельная обработка Excel недоступна, читаем последовательно: {e}")
 
-    def _load_excel_documents(self) -> List[Document]:
-        """Поиск и загрузка .xlsx из self.docs_path рекурсивно."""
         excel_docs: List[Document] = []
-        try:
-            for root, _, files in os.walk(self.docs_path):
-                for name in files:
-                    # Поддерживаем только .xlsx (без .xls, чтобы не тянуть xlrd)
-                    if name.lower().endswith(".xlsx"):
-                        path = os.path.join(root, name)
-                        docs = self._excel_to_text(path)
-                        excel_docs.extend(docs)
-        except Exception as e:
-            print(f"Предупреждение: ошибка при поиске Excel: {e}")
+        for path in paths:
+            docs = results.get(path)
+            if docs is None:
+                docs = self._excel_to_text(path)
+            excel_docs.extend(docs)
         self._notify(f"Excel: сформировано {len(excel_docs)} документ(ов) из .xlsx файлов")
         return excel_docs
 
@@ -490,15 +762,12 @@ class VectorStore:
         if not os.path.isdir(self.normalized_output_dir):
             return []
 
-        loader = DirectoryLoader(
-            self.normalized_output_dir,
-            glob="**/*.norm.txt",
-            loader_cls=TextLoader,
-            loader_kwargs={'encoding': 'utf-8'},
-        )
-
         try:
-            docs = loader.load()
+            paths = sorted(
+                entry.path
+                for entry in _iter_files(self.normalized_output_dir, (".norm.txt",), include_hidden=False)
+            )
+            docs = self._load_text_files(paths)
         except Exception as e:
             print(f"Предупреждение: ошибка при загрузке нормализованных файлов: {e}")
             return []
@@ -507,6 +776,35 @@ class VectorStore:
             doc.metadata["normalized"] = True
         return docs
 
+    async def _aload_text_files(self, paths: List[str]) -> List[Optional[Tuple[str, str]]]:
+        """Читает текстовые файлы параллельно (не больше 64 открытых файлов одновременно)."""
+        semaphore = asyncio.Semaphore(64)
+
+        async def _read(path: str) -> Optional[Tuple[str, str]]:
+            async with semaphore:
+                return await asyncio.to_thread(_read_text_file, path)
+
+        return await asyncio.gather(*(_read(path) for path in paths))
+
+    def _load_text_files(self, paths: List[str]) -> List[Document]:
+        """Загружает текстовые файлы по списку путей (замена DirectoryLoader + TextLoader)."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            results = asyncio.run(self._aload_text_files(paths))
+        else:
+            # Уже внутри event loop — asyncio.run недоступен, читаем последовательно
+            results = [_read_text_file(path) for path in paths]
+        docs: List[Document] = []
+        for path, result in zip(paths, results):
+            if result is None:
+                continue
+            text, content_hash = result
+            # Хеш уже посчитан при чтении — дедупликация возьмёт его отсюда
+            self._text_file_hashes[path] = content_hash
+            docs.append(Document(page_content=text, metadata={"source": path}))
+        return docs
+
     def _shutdown_chroma_client(self, store: Any) -> None:
         """Attempt to stop embedded Chroma client to release file handles."""
         if store is None:
@@ -520,12 +818,20 @@ class VectorStore:
         except Exception as exc:
             print(f"[chroma] Failed to stop client cleanly: {exc}")
 
+    def _open_files_under(self, directory: str) -> List[str]:
+        """Файлы внутри directory, открытые текущим процессом (пусто, если psutil недоступен)."""
+        if psutil is None:
+            return []
+        prefix = os.path.join(os.path.abspath(directory), "")
+        try:
+            return [f.path for f in psutil.Process().open_files() if f.path.startswith(prefix)]
+        except Exception:
+            return []
+
     def _force_close_connections(self):
         """Принудительное закрытие всех соединений ChromaDB"""
         try:
             import gc
-            import threading
-            import subprocess
             
             # Закрываем текущее соединение если есть (без внутренних reset/stop)
             if hasattr(self, 'vectorstore') and self.vectorstore is not None:
@@ -543,25 +849,15 @@ class VectorStore:
             # Принудительная сборка мусора
             gc.collect()
             
-            # Принудительное освобождение файлов через lsof
-            try:
-                # Ищем процессы, использующие файлы в директории векторного хранилища
-                result = subprocess.run(
-                    ['lsof', '+D', self.vector_store_path],
-                    capture_output=True, text=True, timeout=10
-                )
-                if result.returncode == 0 and result.stdout.strip():
-                    print(f"Найдены процессы, использующие файлы: {result.stdout}")
-                    # Просто даем больше времени на освобождение
-                    time.sleep(3)
-                else:
-                    print("Файлы векторного хранилища не используются другими процессами")
-            except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
-                # lsof может быть недоступен или таймаут
-                pass
-            
-            # Даем время системе освободить ресурсы
-            time.sleep(3)
+            # Ждём (с экспоненциальной паузой), пока наш процесс отпустит файлы хранилища
+            busy = self._open_files_under(self.vector_store_path)
+            attempt = 0
+            while busy and attempt < 6:
+                time.sleep(0.1 * 2 ** attempt)
+                attempt += 1
+                busy = self._open_files_under(self.vector_store_path)
+            if busy:
+                print(f"Файлы хранилища всё ещё открыты процессом: {busy}")
             
             print("Соединения ChromaDB закрыты")
             
@@ -570,8 +866,6 @@ class VectorStore:
 
     def _safe_remove_directory(self, directory_path: str, max_attempts: int = 5):
         """Безопасное удаление директории с повторными попытками"""
-        import subprocess
-        
         for attempt in range(max_attempts):
             try:
                 if os.path.exists(directory_path):
@@ -592,18 +886,9 @@ class VectorStore:
                 if e.errno == 16 and attempt < max_attempts - 1:  # Device or resource busy
                     print(f"Директория занята, попытка {attempt + 1}/{max_attempts}. Ждем...")
                     
-                    # Дополнительные попытки освобождения ресурсов
-                    if attempt >= 2:  # После второй попытки становимся более агрессивными
-                        try:
-                            # Попробуем принудительно закрыть процессы, использующие файлы
-                            result = subprocess.run(
-                                ['lsof', '+D', directory_path],
-                                capture_output=True, text=True, timeout=5
-                            )
-                            if result.returncode == 0 and result.stdout.strip():
-                                print("Обнаружены процессы, использующие файлы векторного хранилища")
-                        except:
-                            pass
+                    busy = self._open_files_under(directory_path)
+                    if busy:
+                        print(f"Файлы директории открыты текущим процессом: {busy}")
                     
                     # Увеличиваем время ожидания с каждой попыткой
                     wait_time = min(2 ** attempt, 10)
@@ -637,35 +922,66 @@ class VectorStore:
 
         # Загрузка документов нескольких типов
         print("Загрузка документов...")
+
+        # Один обход дерева документов, файлы раскладываются по расширениям
+        # (.xlsx без .xls, чтобы не тянуть xlrd)
+        paths_by_ext = _group_paths_by_extension(
+            entry.path for entry in _iter_files(self.docs_path, _SOURCE_EXTENSIONS)
+        )
+        # .txt и .pdf раньше собирал DirectoryLoader, который пропускает скрытые пути;
+        # .docx и .xlsx искались через os.walk и скрытые пути включали
+        for ext in (".txt", ".pdf"):
+            paths_by_ext[ext] = [p for p in paths_by_ext[ext] if not _has_hidden_part(p, self.docs_path)]
+        documents, counts = self._load_source_files(paths_by_ext)
+
+        normalized_docs: List[Document] = []
+        try:
+            normalized_docs = self._load_normalized_documents()
+            documents.extend(normalized_docs)
+        except Exception as e:
+            print(f"Предупреждение: ошибка при добавлении нормализованных документов: {e}")
+
+        # Помечаем документы режима обучения до дедупликации
+        self._mark_learning_documents(documents)
+        documents = self._sort_documents_by_priority(self._deduplicate_documents(documents))
+
+        self._notify(
+            f"Загружено {len(documents)} документов (txt: {counts['.txt']}, docx: {counts['.docx']}, "
+            f"pdf: {counts['.pdf']}, excel: {counts['.xlsx']}, normalized: {len(normalized_docs)})"
+        )
+        return documents
+
+    def _load_source_files(
+        self,
+        paths_by_ext: Dict[str, List[str]],
+    ) -> Tuple[List[Document], Dict[str, int]]:
+        """Загружает файлы-источники, сгруппированные по расширению.
+        Возвращает документы и количество документов по каждому типу.
+        """
         documents: List[Document] = []
 
         # TXT
-        txt_loader = DirectoryLoader(
-            self.docs_path,
-            glob="**/*.txt",
-            loader_cls=TextLoader,
-            loader_kwargs={'encoding': 'utf-8'}
-        )
         txt_docs = []
         try:
-            txt_docs = txt_loader.load()
+            txt_docs = self._load_text_files(paths_by_ext[".txt"])
             documents.extend(txt_docs)
         except Exception as e:
             print(f"Предупреждение: ошибка при загрузке .txt: {e}")
 
-        # DOCX (через python-docx)
+        # DOCX (через python-docx): разбор zip/XML отпускает GIL, поэтому хватает потоков
         docx_docs = []
         try:
-            from docx import Document
+            import docx  # noqa: F401 - проверяем наличие python-docx до запуска пула
             from langchain_classic.schema import Document as LangchainDocument
-            
-            for root, dirs, files in os.walk(self.docs_path):
-                for file in files:
-                    if file.endswith('.docx'):
-                        file_path = os.path.join(root, file)
+
+            docx_paths = paths_by_ext[".docx"]
+            if docx_paths:
+                workers = min(32, (os.cpu_count() or 1) * 4, len(docx_paths))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = [(file_path, pool.submit(_docx_to_text, file_path)) for file_path in docx_paths]
+                    for file_path, future in futures:
                         try:
-                            doc = Document(file_path)
-                            text = '\n'.join([paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip()])
+                            text = future.result()
                             if text.strip():
                                 docx_docs.append(LangchainDocument(
                                     page_content=text,
@@ -677,63 +993,189 @@ class VectorStore:
         except Exception as e:
             print(f"Предупреждение: не удалось загрузить .docx (установите зависимости python-docx): {e}")
 
-        # PDF (через unstructured)
+        # PDF (через unstructured; разбор тяжёлый, загружаем файлы в несколько потоков)
         pdf_docs = []
         try:
             from langchain_community.document_loaders import UnstructuredPDFLoader
-            pdf_loader = DirectoryLoader(
-                self.docs_path,
-                glob="**/*.pdf",
-                loader_cls=UnstructuredPDFLoader,
-            )
-            pdf_docs = pdf_loader.load()
+
+            pdf_paths = paths_by_ext[".pdf"]
+            if pdf_paths:
+                with ThreadPoolExecutor(max_workers=min(4, len(pdf_paths))) as pool:
+                    for loaded in pool.map(lambda path: UnstructuredPDFLoader(path).load(), pdf_paths):
+                        pdf_docs.extend(loaded)
             documents.extend(pdf_docs)
         except Exception as e:
             print(f"Предупреждение: не удалось загрузить .pdf (установите зависимости pypdf/unstructured): {e}")
 
-        # XLSX (через pandas → текст)
+        # XLSX (через openpyxl → текст)
         excel_docs = []
         try:
-            excel_docs = self._load_excel_documents()
+            excel_docs = self._load_excel_documents(paths_by_ext[".xlsx"])
             documents.extend(excel_docs)
         except Exception as e:
             print(f"Предупреждение: ошибка при обработке Excel: {e}")
 
-        normalized_docs: List[Document] = []
-        try:
-            normalized_docs = self._load_normalized_documents()
-            documents.extend(normalized_docs)
-        except Exception as e:
-            print(f"Предупреждение: ошибка при добавлении нормализованных документов: {e}")
-
-        # Помечаем документы режима обучения до дедупликации
-        self._mark_learning_documents(documents)
+        counts = {
+            ".txt": len(txt_docs),
+            ".docx": len(docx_docs),
+            ".pdf": len(pdf_docs),
+            ".xlsx": len(excel_docs),
+        }
+        return documents, counts
 
+    def _deduplicate_documents(self, documents: List[Document]) -> List[Document]:
+        """Убирает документы с одинаковым содержимым, оставляя вариант с высшим приоритетом."""
         unique_docs: List[Document] = []
+        # Приоритеты оставленных документов, параллельно unique_docs
+        ranks: List[int] = []
         index_by_hash: Dict[str, int] = {}
-        for doc in documents:
-            content = doc.page_content or ""
-            content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
-            if content_hash in index_by_hash:
-                existing_idx = index_by_hash[content_hash]
-                existing_doc = unique_docs[existing_idx]
-                if self._doc_priority_rank(doc) < self._doc_priority_rank(existing_doc):
+        for doc, content_hash in zip(documents, self._document_hashes(documents)):
+            rank = self._doc_priority_rank(doc)
+            existing_idx = index_by_hash.get(content_hash)
+            if existing_idx is not None:
+                if rank < ranks[existing_idx]:
                     unique_docs[existing_idx] = doc
+                    ranks[existing_idx] = rank
                 continue
             index_by_hash[content_hash] = len(unique_docs)
             unique_docs.append(doc)
+            ranks.append(rank)
 
         deduplicated = len(documents) - len(unique_docs)
         if deduplicated:
             self._notify(f"Удалено дубликатов документов: {deduplicated}")
+        return unique_docs
 
-        documents = self._sort_documents_by_priority(unique_docs)
+    # === Кеш хешей содержимого (mtime+size) ===
+    @property
+    def _ingest_cache_path(self) -> str:
+        # Рядом с хранилищем, а не внутри: директория хранилища заменяется при пересборке
+        return f"{self.vector_store_path}.ingest_cache.db"
 
-        self._notify(
-            f"Загружено {len(documents)} документов (txt: {len(txt_docs)}, docx: {len(docx_docs)}, pdf: {len(pdf_docs)}, "
-            f"excel: {len(excel_docs)}, normalized: {len(normalized_docs)})"
-        )
-        return documents
+    def _ingest_cache_key(self, doc: Document) -> Optional[Tuple[str, int, int]]:
+        """Ключ документа в кеше: (путь[::лист::формат], mtime_ns, size) или None без файла-источника."""
+        source = doc.metadata.get("source")
+        if not source:
+            return None
+        try:
+            st = os.stat(source)
+        except OSError:
+            return None
+        key = os.path.abspath(source)
+        if doc.metadata.get("excel"):
+            # Текст листа зависит ещё и от настроек форматирования
+            key = (
+                f"{key}::{doc.metadata.get('sheet_name', '')}"
+                f"::{self.excel_output_format}:{self.excel_max_rows}"
+            )
+        return key, st.st_mtime_ns, st.st_size
+
+    def _open_ingest_cache(self, check_same_thread: bool = True) -> Optional[sqlite3.Connection]:
+        """Открывает sqlite ingest-кеша (хеши файлов и эмбеддинги); None, если он недоступен."""
+        conn: Optional[sqlite3.Connection] = None
+        try:
+            conn = sqlite3.connect(self._ingest_cache_path, check_same_thread=check_same_thread)
+            # WAL + synchronous=NORMAL: запись без fsync на каждую транзакцию
+            conn.executescript(
+                "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; "
+                "PRAGMA temp_store=MEMORY; PRAGMA mmap_size=268435456;"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS files("
+                "path TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, hash TEXT)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings("
+                "hash TEXT, model TEXT, vector BLOB, PRIMARY KEY (hash, model))"
+            )
+            return conn
+        except sqlite3.Error as e:
+            print(f"Предупреждение: ingest-кеш недоступен, работаем без него: {e}")
+            if conn is not None:
+                conn.close()
+            return None
+
+    def _embedding_cache_get(
+        self,
+        conn: sqlite3.Connection,
+        model: str,
+        hashes: List[str],
+    ) -> Dict[str, List[float]]:
+        """Достаёт сохранённые векторы по хешам чанков (IN-списками до 900 параметров)."""
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        try:
+            for start in range(0, len(unique), 900):
+                part = unique[start:start + 900]
+                rows = conn.execute(
+                    "SELECT hash, vector FROM embeddings WHERE model=? AND hash IN "
+                    f"({','.join('?' * len(part))})",
+                    (model, *part),
+                )
+                for content_hash, blob in rows:
+                    found[content_hash] = np.frombuffer(blob, dtype=np.float32).tolist()
+        except sqlite3.Error as e:
+            print(f"Предупреждение: не удалось прочитать кеш эмбеддингов: {e}")
+        return found
+
+    def _embedding_cache_put(
+        self,
+        conn: sqlite3.Connection,
+        model: str,
+        hashes: List[str],
+        vectors: List[List[float]],
+    ) -> None:
+        """Сохраняет векторы (float32) по хешам чанков одной транзакцией."""
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings VALUES(?,?,?)",
+                    (
+                        (content_hash, model, np.asarray(vector, dtype=np.float32).tobytes())
+                        for content_hash, vector in zip(hashes, vectors)
+                    ),
+                )
+        except sqlite3.Error as e:
+            print(f"Предупреждение: не удалось обновить кеш эмбеддингов: {e}")
+
+    def _document_hashes(self, documents: List[Document]) -> List[str]:
+        """Возвращает хеши содержимого документов.
+        Для файлов с неизменными mtime и размером хеш берётся из ingest-кеша без пересчёта.
+        """
+        conn = self._open_ingest_cache()
+        hashes: List[str] = []
+        new_rows: List[Tuple[str, int, int, str]] = []
+        hits = 0
+        for doc in documents:
+            cache_key = self._ingest_cache_key(doc) if conn is not None else None
+            content_hash = None
+            if cache_key is not None:
+                row = conn.execute(
+                    "SELECT hash FROM files WHERE path=? AND mtime=? AND size=?", cache_key
+                ).fetchone()
+                if row:
+                    content_hash = row[0]
+                    hits += 1
+            if content_hash is None:
+                content_hash = self._text_file_hashes.get(doc.metadata.get("source"))
+            if content_hash is None:
+                content_hash = _content_hash((doc.page_content or "").encode("utf-8"))
+                if cache_key is not None:
+                    new_rows.append((*cache_key, content_hash))
+            hashes.append(content_hash)
+
+        if conn is not None:
+            try:
+                # Все новые записи одной транзакцией в конце загрузки
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO files VALUES(?,?,?,?)", new_rows)
+            except sqlite3.Error as e:
+                print(f"Предупреждение: не удалось обновить кеш хешей: {e}")
+            finally:
+                conn.close()
+        if hits:
+            self._notify(f"Кеш хешей: {hits}/{len(documents)} документов без пересчёта")
+        return hashes
 
     def _split_documents(self, documents: List[Document]) -> List[Document]:
         """Разбиение документов на чанки"""
@@ -741,6 +1183,122 @@ class VectorStore:
         print(f"Создано {len(chunks)} чанков")
         return chunks
 
+    def _pack_batches(self, texts: List[str]) -> List[tuple]:
+        """Жадно упаковывает тексты в батчи по лимитам токенов и количества входов.
+        Возвращает список (start, end, tokens); без tiktoken токены не считаются.
+        """
+        if tiktoken is None:
+            return [
+                (start, min(start + _EMBED_BATCH_MAX_ITEMS, len(texts)), None)
+                for start in range(0, len(texts), _EMBED_BATCH_MAX_ITEMS)
+            ]
+        encoding = tiktoken.encoding_for_model("text-embedding-3-large")
+        batches = []
+        start, tokens = 0, 0
+        for idx, count in enumerate(len(ids) for ids in encoding.encode_batch(texts, disallowed_special=())):
+            if idx > start and (
+                idx - start >= _EMBED_BATCH_MAX_ITEMS or tokens + count > _EMBED_BATCH_MAX_TOKENS
+            ):
+                batches.append((start, idx, tokens))
+                start, tokens = idx, 0
+            tokens += count
+        if start < len(texts):
+            batches.append((start, len(texts), tokens))
+        return batches
+
+    async def _aembed_and_write(
+        self,
+        texts: List[str],
+        write: Callable[[int, int, List[List[float]]], None],
+    ) -> None:
+        """Конвейер: батчи эмбеддингов считаются параллельно (не больше embedding_concurrency
+        запросов одновременно) и по мере готовности передаются в write(start, end, vectors)
+        отдельной задачей. Очередь ограничена, поэтому в памяти одновременно держится лишь
+        несколько батчей векторов.
+        """
+        batches = self._pack_batches(texts)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+        semaphore = asyncio.Semaphore(self.embedding_concurrency)
+        done = 0
+
+        async def _embed_batch(start: int, end: int, tokens: Optional[int]) -> None:
+            nonlocal done
+            # Семафор держим до постановки в очередь, чтобы не копить готовые векторы
+            async with semaphore:
+                vectors = await self.embeddings.aembed_documents(texts[start:end])
+                await queue.put((start, end, vectors))
+            done += 1
+            token_info = f", токенов: {tokens}" if tokens is not None else ""
+            self._notify(f"Эмбеддинги: {done}/{len(batches)} батчей (текстов: {end - start}{token_info})")
+
+        async def _embed_all() -> None:
+            await asyncio.gather(*(_embed_batch(*batch) for batch in batches))
+            await queue.put(None)
+
+        async def _write_all() -> None:
+            while (item := await queue.get()) is not None:
+                await asyncio.to_thread(write, *item)
+
+        await asyncio.gather(_embed_all(), _write_all())
+
+    def _embed_and_write(self, store: Chroma, chunks: List[Document]) -> None:
+        """Записывает чанки в store, запрашивая эмбеддинги только для тех,
+        которых ещё нет в кеше эмбеддингов (ключ — хеш текста чанка и модель).
+        """
+        conn = self._open_ingest_cache(check_same_thread=False)
+        try:
+            model = str(getattr(self.embeddings, "model", ""))
+            hashes = [_content_hash(chunk.page_content.encode("utf-8")) for chunk in chunks]
+            cached = self._embedding_cache_get(conn, model, hashes) if conn is not None else {}
+            hits = [idx for idx, content_hash in enumerate(hashes) if content_hash in cached]
+            if hits:
+                self._notify(f"Кеш эмбеддингов: {len(hits)}/{len(chunks)} чанков без запроса к API")
+                self._add_embedded_chunks(
+                    store,
+                    [chunks[idx] for idx in hits],
+                    [cached[hashes[idx]] for idx in hits],
+                )
+            missing = [idx for idx, content_hash in enumerate(hashes) if content_hash not in cached]
+            texts = [chunks[idx].page_content for idx in missing]
+
+            def _write(start: int, end: int, vectors: List[List[float]]) -> None:
+                batch = missing[start:end]
+                self._add_embedded_chunks(store, [chunks[idx] for idx in batch], vectors)
+                if conn is not None:
+                    self._embedding_cache_put(conn, model, [hashes[idx] for idx in batch], vectors)
+
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                asyncio.run(self._aembed_and_write(texts, _write))
+                return
+            # Уже внутри event loop — asyncio.run недоступен, считаем и пишем последовательно
+            for start, end, _ in self._pack_batches(texts):
+                _write(start, end, self.embeddings.embed_documents(texts[start:end]))
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _add_embedded_chunks(
+        self,
+        store: Chroma,
+        chunks: List[Document],
+        embeddings: List[List[float]],
+    ) -> None:
+        """Записывает чанки с заранее посчитанными векторами в коллекцию Chroma."""
+        try:
+            max_batch = store._client.get_max_batch_size()
+        except Exception:
+            max_batch = 5000
+        for start in range(0, len(chunks), max_batch):
+            batch = chunks[start:start + max_batch]
+            store._collection.upsert(
+                ids=[str(uuid.uuid4()) for _ in batch],
+                embeddings=embeddings[start:start + max_batch],
+                metadatas=[doc.metadata for doc in batch],
+                documents=[doc.page_content for doc in batch],
+            )
+
     def create(self, force_recreate: bool = True) -> 'VectorStore':
         """Создание или пересборка векторного хранилища."""
         self._notify("Создание нового векторного хранилища...")
@@ -751,17 +1309,126 @@ class VectorStore:
         if not force_recreate:
             try:
                 if not self.is_empty():
+                    manifest = self._load_manifest()
+                    if manifest is not None and self.needs_rebuild():
+                        self._notify("Хранилище устарело — обновляем только изменённые файлы")
+                        return self._apply_incremental_update(manifest)
                     self._notify(
                         "Хранилище уже существует — выполняем загрузку (force_recreate=False)"
                     )
                     return self.load()
-            except Exception:
-                # Если не удалось загрузить, продолжаем с пересборкой
-                pass
+            except Exception as e:
+                # Если не удалось загрузить или обновить, продолжаем с пересборкой
+                self._notify(f"Не удалось использовать существующее хранилище ({e}), выполняем пересборку")
 
         # Safe rebuild сохраняет текущий индекс до успешной пересборки
         return self.safe_rebuild()
 
+    def _diff_manifest(
+        self,
+        old_items: List[Dict[str, str]],
+        new_items: List[Dict[str, str]],
+    ) -> Tuple[List[str], List[str], List[str]]:
+        """Сравнивает списки файлов манифеста и возвращает (добавленные, удалённые, изменённые) rel-пути."""
+        old = {item["rel"]: (item.get("mtime"), item.get("size")) for item in old_items}
+        new = {item["rel"]: (item.get("mtime"), item.get("size")) for item in new_items}
+        added = sorted(new.keys() - old.keys())
+        removed = sorted(old.keys() - new.keys())
+        modified = sorted(rel for rel in new.keys() & old.keys() if new[rel] != old[rel])
+        return added, removed, modified
+
+    def _is_derived_source(self, source: str, rel: str) -> bool:
+        """Проверяет, получен ли источник чанка из файла rel: сам файл в docs_path
+        или его нормализованная копия (для Excel — по копии на каждый лист).
+        """
+        if os.path.normpath(source) == os.path.normpath(os.path.join(self.docs_path, rel)):
+            return True
+        try:
+            norm_rel = os.path.relpath(source, start=self.normalized_output_dir)
+        except ValueError:
+            return False
+        rel = os.path.normpath(rel)
+        return norm_rel == f"{rel}.norm.txt" or (
+            norm_rel.startswith(f"{rel}__") and norm_rel.endswith(".norm.txt")
+        )
+
+    def _remove_normalized_copies(self, rels: List[str]) -> None:
+        """Удаляет с диска нормализованные копии файлов, иначе старый текст вернётся в индекс."""
+        if not (self.save_normalized_docs and os.path.isdir(self.normalized_output_dir)):
+            return
+        for entry in _iter_files(self.normalized_output_dir, (".norm.txt",)):
+            if any(self._is_derived_source(entry.path, rel) for rel in rels):
+                try:
+                    os.remove(entry.path)
+                except OSError as e:
+                    print(f"Предупреждение: не удалось удалить нормализованную копию {entry.path}: {e}")
+
+    def _apply_incremental_update(self, manifest: Dict) -> 'VectorStore':
+        """Обновляет существующее хранилище по разнице с манифестом.
+        Корпус загружается и дедуплицируется целиком, как при полной пересборке;
+        заново эмбеддятся только документы, которых нет в индексе или которые получены
+        из изменённых файлов, а чанки выбывших документов удаляются.
+        Если разницы по манифесту нет (например, файл переписан без смены размера
+        в ту же секунду), бросает ValueError, чтобы вызывающий выполнил полную пересборку.
+        """
+        new_items = self._gather_source_files()
+        added, removed, modified = self._diff_manifest(manifest.get("files", []), new_items)
+        if not (added or removed or modified):
+            raise ValueError("изменения не определяются по манифесту")
+        self._notify(
+            f"Инкрементальное обновление: добавлено {len(added)}, удалено {len(removed)}, "
+            f"изменено {len(modified)}"
+        )
+
+        def doc_key(metadata: Dict[str, Any]) -> Tuple[Any, Any]:
+            # Excel-файл даёт по документу на лист с общим source
+            return metadata.get("source"), metadata.get("sheet_name")
+
+        stale_rels = removed + modified
+        with FileLock(self.lock_file_path, timeout=30):
+            if self.vectorstore is None:
+                self.load()
+
+            self._remove_normalized_copies(stale_rels)
+            documents = self._load_documents()
+
+            indexed = self.vectorstore.get(include=["metadatas"])
+            stale_keys = set()
+            indexed_keys = set()
+            for metadata in indexed["metadatas"]:
+                key = doc_key(metadata or {})
+                indexed_keys.add(key)
+                if key[0] and any(self._is_derived_source(key[0], rel) for rel in stale_rels):
+                    stale_keys.add(key)
+            keep_keys = {doc_key(doc.metadata) for doc in documents}
+            drop_keys = (indexed_keys - keep_keys) | stale_keys
+
+            stale_ids = [
+                chunk_id
+                for chunk_id, metadata in zip(indexed["ids"], indexed["metadatas"])
+                if doc_key(metadata or {}) in drop_keys
+            ]
+            if stale_ids:
+                self.vectorstore.delete(ids=stale_ids)
+
+            new_documents = [
+                doc for doc in documents
+                if doc_key(doc.metadata) not in indexed_keys or doc_key(doc.metadata) in drop_keys
+            ]
+            if new_documents:
+                self._save_raw_documents(new_documents)
+                chunks = self._split_documents(new_documents)
+                if chunks:
+                    self._embed_and_write(self.vectorstore, chunks)
+            self._notify(
+                f"Удалено чанков: {len(stale_ids)}, переиндексировано документов: {len(new_documents)}"
+            )
+
+            self._save_manifest(new_items)
+
+        self._notify("Инкрементальное обновление хранилища завершено")
+        return self
+
     def load(self) -> 'VectorStore':
         """Загрузка существующего векторного хранилища"""
         if not os.path.exists(self.vector_store_path):
@@ -822,6 +1489,25 @@ class VectorStore:
             print(f"Ошибка при поиске в векторном хранилище: {e}")
             return []
 
+    def _remove_stale_rebuild_dirs(self) -> None:
+        """Удаляет backup и временные каталоги, оставшиеся от прерванных пересборок.
+        Вызывается под FileLock, поэтому другой пересборки в этот момент нет.
+        """
+        store_path = os.path.normpath(self.vector_store_path)
+        parent_dir = os.path.dirname(store_path) or "."
+        basename = os.path.basename(store_path)
+        try:
+            entries = list(os.scandir(parent_dir))
+        except OSError:
+            return
+        for entry in entries:
+            name = entry.name
+            stale_backup = name.startswith(f"{basename}_backup_") and name.rpartition("_")[2].isdigit()
+            stale_new = name.startswith(f".{basename}_new_") and _is_rebuild_temp_dir(name)
+            if (stale_backup or stale_new) and entry.is_dir(follow_symlinks=False):
+                self._notify(f"Удаляем остатки прерванной пересборки: {entry.path}")
+                shutil.rmtree(entry.path, ignore_errors=True)
+
     def safe_rebuild(self) -> 'VectorStore':
         """Безопасная пересборка векторного хранилища через переключение директорий"""
         self._notify("Начинается безопасная пересборка векторного хранилища...")
@@ -830,9 +1516,15 @@ class VectorStore:
 
         # Создаем блокировку для предотвращения одновременного доступа
         with FileLock(self.lock_file_path, timeout=30):
+            self._remove_stale_rebuild_dirs()
             try:
                 # Создаем новую директорию для векторного хранилища
-                new_store_path = f"{self.vector_store_path}_new_{int(time.time())}"
+                # Рядом со старым хранилищем: та же ФС, поэтому os.replace только меняет метаданные
+                store_path = os.path.normpath(self.vector_store_path)
+                new_store_path = os.path.join(
+                    os.path.dirname(store_path),
+                    f".{os.path.basename(store_path)}_new_{int(time.time())}",
+                )
                 self._notify(f"Создается новое хранилище в: {new_store_path}")
                 
                 # Загружаем и обрабатываем документы
@@ -849,12 +1541,12 @@ class VectorStore:
 
                 # Создаем новое хранилище в новой директории
                 self._notify("Создание нового векторного хранилища...")
-                new_vectorstore = Chroma.from_documents(
-                    documents=chunks,
-                    embedding=self.embeddings,
+                new_vectorstore = Chroma(
+                    embedding_function=self.embeddings,
                     persist_directory=new_store_path,
                     client_settings=self.client_settings,
                 )
+                self._embed_and_write(new_vectorstore, chunks)
                 
                 # Сохраняем новое хранилище
                 #new_vectorstore.persist()
@@ -869,37 +1561,38 @@ class VectorStore:
                     self._notify("Закрываем старое хранилище...")
                     self._force_close_connections()
                 
-                # Создаем backup старого хранилища если оно существует
-                backup_path = None
-                if os.path.exists(self.vector_store_path):
-                    backup_path = f"{self.vector_store_path}_backup_{int(time.time())}"
-                    self._notify(f"Создаем backup старого хранилища: {backup_path}")
+                with _STORE_SWAP_LOCK:
+                    # Создаем backup старого хранилища если оно существует
+                    backup_path = None
+                    if os.path.exists(self.vector_store_path):
+                        backup_path = f"{self.vector_store_path}_backup_{int(time.time())}"
+                        self._notify(f"Создаем backup старого хранилища: {backup_path}")
+                        try:
+                            os.replace(self.vector_store_path, backup_path)
+                        except Exception as e:
+                            self._notify(f"Не удалось создать backup: {e}")
+                            # Если не можем переместить, просто продолжаем
+                            backup_path = None
+                
+                    # Перемещаем новое хранилище на место старого
+                    self._notify(f"Активируем новое хранилище...")
                     try:
-                        shutil.move(self.vector_store_path, backup_path)
+                        os.replace(new_store_path, self.vector_store_path)
+                        self._notify("Новое хранилище успешно активировано")
                     except Exception as e:
-                        self._notify(f"Не удалось создать backup: {e}")
-                        # Если не можем переместить, просто продолжаем
-                        backup_path = None
+                        # Если не удалось переместить, восстанавливаем backup
+                        self._notify(f"Ошибка при активации нового хранилища: {e}")
+                        if backup_path and os.path.exists(backup_path):
+                            self._notify("Восстанавливаем backup...")
+                            os.replace(backup_path, self.vector_store_path)
+                            backup_path = None
+                        raise
                 
-                # Перемещаем новое хранилище на место старого
-                self._notify(f"Активируем новое хранилище...")
-                try:
-                    shutil.move(new_store_path, self.vector_store_path)
-                    self._notify("Новое хранилище успешно активировано")
-                except Exception as e:
-                    # Если не удалось переместить, восстанавливаем backup
-                    self._notify(f"Ошибка при активации нового хранилища: {e}")
-                    if backup_path and os.path.exists(backup_path):
-                        self._notify("Восстанавливаем backup...")
-                        shutil.move(backup_path, self.vector_store_path)
-                        backup_path = None
-                    raise
+                    # Загружаем новое хранилище
+                    self.load()
+                    self._notify("Пересборка векторного хранилища завершена успешно!")
                 
-                # Загружаем новое хранилище
-                self.load()
-                self._notify("Пересборка векторного хранилища завершена успешно!")
-                
-                # Удаляем backup если все прошло успешно
+                # Удаляем backup если все прошло успешно (уже вне блокировки переключения)
                 if backup_path and os.path.exists(backup_path):
                     try:
                         self._notify(f"Удаляем backup: {backup_path}")
@@ -970,43 +1663,57 @@ class VectorStore:
     def _manifest_path(self) -> str:
         return os.path.join(self.vector_store_path, "_manifest.json")
 
+    def _scan_source_dir(self, directory: str) -> Tuple[List[Dict[str, str]], List[str]]:
+        """Читает один каталог: файлы-источники с mtime/размером и список подкаталогов."""
+        items: List[Dict[str, str]] = []
+        subdirs: List[str] = []
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as e:
+            print(f"Предупреждение: не удалось прочитать каталог '{directory}': {e}")
+            return items, subdirs
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if not _is_rebuild_temp_dir(entry.name):
+                    subdirs.append(entry.path)
+            elif entry.name.lower().endswith(_SOURCE_EXTENSIONS) and entry.is_file():
+                try:
+                    st = entry.stat()
+                except OSError:
+                    # Файл исчез между scandir и stat
+                    continue
+                items.append({
+                    "rel": os.path.relpath(entry.path, self.docs_path),
+                    "mtime": str(int(st.st_mtime)),
+                    "size": str(st.st_size),
+                })
+        return items, subdirs
+
     def _gather_source_files(self) -> List[Dict[str, str]]:
         """Сканирует self.docs_path и собирает список файлов-источников с mtime и размером.
         Поддерживаемые расширения: .txt, .docx, .xlsx, .pdf
         """
-        exts = {".txt", ".docx", ".xlsx", ".pdf"}
         results: List[Dict[str, str]] = []
         if not os.path.isdir(self.docs_path):
             return results
-        for root, _, files in os.walk(self.docs_path):
-            for f in files:
-                _, ext = os.path.splitext(f.lower())
-                if ext in exts:
-                    full = os.path.join(root, f)
-                    try:
-                        st = os.stat(full)
-                        rel = os.path.relpath(full, self.docs_path)
-                        results.append({
-                            "rel": rel,
-                            "mtime": str(int(st.st_mtime)),
-                            "size": str(st.st_size),
-                        })
-                    except Exception:
-                        pass
+        # Каталоги сканируются параллельно: на сетевых маунтах время уходит на ожидание stat
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            pending = {pool.submit(self._scan_source_dir, self.docs_path)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    items, subdirs = future.result()
+                    results.extend(items)
+                    pending.update(pool.submit(self._scan_source_dir, subdir) for subdir in subdirs)
         # Сортируем для детерминированного хеша
         results.sort(key=lambda x: x["rel"])
         return results
 
     def _compute_signature(self, items: List[Dict[str, str]]) -> str:
-        h = hashlib.sha256()
-        for it in items:
-            h.update(it["rel"].encode("utf-8"))
-            h.update(b"|")
-            h.update(it["mtime"].encode("utf-8"))
-            h.update(b"|")
-            h.update(it["size"].encode("utf-8"))
-            h.update(b"\n")
-        return h.hexdigest()
+        # Одна строка на все файлы и один вызов хеша; байты те же, что и раньше,
+        # поэтому подписи в уже сохранённых манифестах остаются валидными
+        payload = "".join(f"{it['rel']}|{it['mtime']}|{it['size']}\n" for it in items)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
     def _load_manifest(self) -> Optional[Dict]:
         try:
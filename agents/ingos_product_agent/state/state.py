@@ -11,3 +11,5 @@ class ProductAgentState(CommonAgentState):
     product: str
     verification_result: str
     verification_reason: str
+    # Ids of the vector-prefetch SystemMessages currently in `messages`, replaced every turn.
+    prefetch_message_ids: list[str]
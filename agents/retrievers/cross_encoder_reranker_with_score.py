@@ -1,10 +1,80 @@
 
 from copy import deepcopy
 from math import ceil
-from typing import List, Optional
+import threading
+from typing import List, Optional, Tuple
 
 from langchain_classic.retrievers.document_compressors import CrossEncoderReranker
 from langchain_classic.schema import Document
+from langchain_community.cross_encoders import BaseCrossEncoder
+
+
+class _PendingScore:
+    __slots__ = ("pairs", "scores", "error", "done")
+
+    def __init__(self, pairs: List[Tuple[str, str]]):
+        self.pairs = pairs
+        self.scores: List[float] = []
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+class CoalescingCrossEncoder(BaseCrossEncoder):
+    """Shares one cross-encoder between threads, scoring concurrently queued requests in one forward pass.
+
+    A single worker thread takes every request queued while the previous pass ran, so an
+    idle model scores immediately and a busy one batches whatever piled up meanwhile.
+    """
+
+    def __init__(self, model: BaseCrossEncoder, max_batch_pairs: int = 256):
+        self.model = model
+        self.max_batch_pairs = int(max_batch_pairs)
+        self._pending: List[_PendingScore] = []
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+
+    def score(self, text_pairs: List[Tuple[str, str]]) -> List[float]:
+        pairs = list(text_pairs)
+        if not pairs:
+            return []
+        request = _PendingScore(pairs)
+        with self._cond:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="cross-encoder-batcher", daemon=True)
+                self._worker.start()
+            self._pending.append(request)
+            self._cond.notify()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.scores
+
+    def _take_batch(self) -> List[_PendingScore]:
+        batch = [self._pending.pop(0)]
+        size = len(batch[0].pairs)
+        while self._pending and size + len(self._pending[0].pairs) <= self.max_batch_pairs:
+            size += len(self._pending[0].pairs)
+            batch.append(self._pending.pop(0))
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                batch = self._take_batch()
+            try:
+                scores = self.model.score([pair for request in batch for pair in request.pairs])
+                offset = 0
+                for request in batch:
+                    request.scores = list(scores[offset : offset + len(request.pairs)])
+                    offset += len(request.pairs)
+            except Exception as exc:
+                for request in batch:
+                    request.error = exc
+            finally:
+                for request in batch:
+                    request.done.set()
 
 class CrossEncoderRerankerWithScores(CrossEncoderReranker):
     """Same as CrossEncoderReranker but stores the rerank score in doc.metadata['rerank_score']."""
@@ -85,11 +155,14 @@ class TournamentCrossEncoderReranker(CrossEncoderRerankerWithScores):
         while len(current) > self.tournament_size:
             next_round: List[Document] = []
 
+            # Pair scores are independent, so the whole round goes through one model call
+            scored_round = self._score_and_tag(current, query)
+
             # Process in fixed-size chunks (last chunk may be smaller)
             for i in range(0, len(current), self.tournament_size):
                 chunk = current[i : i + self.tournament_size]
-                # Score within the chunk and keep top half (ceil)
-                scored_chunk = self._score_and_tag(chunk, query)
+                # Keep top half (ceil) of the chunk
+                scored_chunk = scored_round[i : i + self.tournament_size]
                 scored_chunk.sort(key=lambda d: d.metadata["rerank_score"], reverse=True)
                 keep_k = max(1, ceil(len(chunk) / 2))
                 next_round.extend(scored_chunk[:keep_k])
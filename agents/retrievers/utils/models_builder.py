@@ -37,8 +37,12 @@ def getRerankerModel()-> HuggingFaceCrossEncoder:
     global _reranker_model
     if _reranker_model is None:
         logging.info(f"loading model for reranker: {config.RERANKING_MODEL}")
+        model_kwargs = {'trust_remote_code': True, "device": _device}
+        if _device == "cuda":
+            # Half-precision weights halve memory traffic of every rerank forward pass
+            model_kwargs["model_kwargs"] = {"torch_dtype": torch.float16}
         _reranker_model = HuggingFaceCrossEncoder(
             model_name=config.RERANKING_MODEL, 
-            model_kwargs={'trust_remote_code': True, "device": _device}
+            model_kwargs=model_kwargs
         )
     return _reranker_model
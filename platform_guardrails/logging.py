@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import atexit
 import json
 import re
+import threading
 import time
 from collections.abc import Iterable
 from pathlib import Path
+from queue import SimpleQueue
 from typing import Any
 
 from langchain_core.callbacks import BaseCallbackHandler
@@ -198,9 +201,61 @@ class GuardrailEventLogger:
         self._file.flush()
 
 
+class BackgroundLogWriter:
+    """Appends text records to one file from a daemon thread that keeps the handle open."""
+
+    def __init__(self, path: str) -> None:
+        self._path = Path(path)
+        self._queue: SimpleQueue[str | None] = SimpleQueue()
+        self._thread = threading.Thread(target=self._drain, name=f"log-writer:{path}", daemon=True)
+        self._thread.start()
+
+    def write(self, text: str) -> None:
+        self._queue.put(text)
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _drain(self) -> None:
+        if self._path.parent and str(self._path.parent) not in {"", "."}:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._path.open("a", encoding="utf-8", buffering=1 << 16) as log_file:
+            for record in iter(self._queue.get, None):
+                log_file.write(record)
+                if self._queue.empty():
+                    log_file.flush()
+
+
+_background_writers: dict[str, BackgroundLogWriter] = {}
+_background_writers_lock = threading.Lock()
+
+
+def get_background_log_writer(path: str) -> BackgroundLogWriter:
+    """Shared writer per path, so every middleware logging to one file uses one handle."""
+    key = str(Path(path).resolve())
+    with _background_writers_lock:
+        writer = _background_writers.get(key)
+        if writer is None:
+            writer = BackgroundLogWriter(path)
+            _background_writers[key] = writer
+        return writer
+
+
+@atexit.register
+def _close_background_writers() -> None:
+    with _background_writers_lock:
+        writers = list(_background_writers.values())
+        _background_writers.clear()
+    for writer in writers:
+        writer.close()
+
+
 __all__ = [
+    "BackgroundLogWriter",
     "GuardrailEventLogger",
     "RedactingJSONFileTracer",
+    "get_background_log_writer",
     "redact_text",
     "redact_value",
 ]
@@ -17,12 +17,13 @@ from langgraph.utils.runnable import RunnableCallable
 from .context import GuardrailContext, build_guardrail_context
 from .decisions import GuardrailDecision, redact
 from .injection import SECURITY_BLOCK_MESSAGE_RU, SECURITY_REVIEW_MESSAGE_RU
-from .logging import GuardrailEventLogger
+from .logging import GuardrailEventLogger, get_background_log_writer
 from .privacy import (
     PalimpsestSessionManager,
     PrivacyRail,
     _call_text_transform,
     clone_message_with_transform,
+    clone_messages_with_batch_transform,
     map_strings,
     state_has_reset_message,
     thread_id_from_runtime,
@@ -54,7 +55,7 @@ class PalimpsestSessionMiddleware(AgentMiddleware):
         super().__init__()
         self._sessions = sessions
         self._anonymize_tool_results = anonymize_tool_results
-        self._log_path = log_path
+        self._log_writer = get_background_log_writer(log_path) if log_path else None
 
     def before_agent(self, state, runtime) -> Dict[str, Any] | None:
         if state_has_reset_message(state):
@@ -64,20 +65,20 @@ class PalimpsestSessionMiddleware(AgentMiddleware):
     async def abefore_agent(self, state, runtime) -> Dict[str, Any] | None:
         return self.before_agent(state, runtime)
 
-    def _transform_messages(self, messages: Iterable[BaseMessage], session: Any) -> List[BaseMessage]:
-        transformed: List[BaseMessage] = []
-        log_rows: List[tuple[Any, Any]] = []
-        anonymize = lambda text: _call_text_transform(session, "anonymize", text)
-        for message in messages:
-            updated = clone_message_with_transform(message, anonymize)
-            transformed.append(updated)
-            if self._log_path:
-                log_rows.append((getattr(message, "content", None), getattr(updated, "content", None)))
-        if log_rows:
-            with open(self._log_path, "a", encoding="utf-8") as log_file:
-                for before, after in log_rows:
-                    log_file.write(f"BEFORE ANONIMIZATION:\n{before}\n")
-                    log_file.write(f"AFTER ANONIMIZATION:\n{after}\n\n")
+    def _transform_messages(self, messages: Iterable[BaseMessage], session_id: str | None) -> List[BaseMessage]:
+        messages = list(messages)
+        transformed = clone_messages_with_batch_transform(
+            messages,
+            lambda texts: self._sessions.anonymize_many(texts, session_id=session_id),
+        )
+        if self._log_writer is not None and messages:
+            self._log_writer.write(
+                "".join(
+                    f"BEFORE ANONIMIZATION:\n{getattr(message, 'content', None)}\n"
+                    f"AFTER ANONIMIZATION:\n{getattr(updated, 'content', None)}\n\n"
+                    for message, updated in zip(messages, transformed)
+                )
+            )
         return transformed
 
     def _deanonymize_ai_message(self, message: BaseMessage, session: Any) -> BaseMessage:
@@ -85,10 +86,11 @@ class PalimpsestSessionMiddleware(AgentMiddleware):
             return message
         deanonymize = lambda text: _call_text_transform(session, "deanonymize", text)
         updated = clone_message_with_transform(message, deanonymize)
-        if self._log_path:
-            with open(self._log_path, "a", encoding="utf-8") as log_file:
-                log_file.write(f"BEFORE DEANONIMIZATION:\n{message.content}\n")
-                log_file.write(f"AFTER DEANONIMIZATION:\n{updated.content}\n\n")
+        if self._log_writer is not None:
+            self._log_writer.write(
+                f"BEFORE DEANONIMIZATION:\n{message.content}\n"
+                f"AFTER DEANONIMIZATION:\n{updated.content}\n\n"
+            )
         return updated
 
     def _deanonymize_model_result(self, result: Any, session: Any) -> Any:
@@ -107,13 +109,15 @@ class PalimpsestSessionMiddleware(AgentMiddleware):
         return result
 
     def wrap_model_call(self, request, handler):
-        session = self._sessions.session_for_runtime(request.runtime)
-        updated_request = request.override(messages=self._transform_messages(request.messages, session))
+        session_id = thread_id_from_runtime(request.runtime)
+        session = self._sessions.get_session(session_id)
+        updated_request = request.override(messages=self._transform_messages(request.messages, session_id))
         return self._deanonymize_model_result(handler(updated_request), session)
 
     async def awrap_model_call(self, request, handler):
-        session = self._sessions.session_for_runtime(request.runtime)
-        updated_request = request.override(messages=self._transform_messages(request.messages, session))
+        session_id = thread_id_from_runtime(request.runtime)
+        session = self._sessions.get_session(session_id)
+        updated_request = request.override(messages=self._transform_messages(request.messages, session_id))
         return self._deanonymize_model_result(await handler(updated_request), session)
 
     def wrap_tool_call(self, request: ToolCallRequest, handler):
@@ -140,12 +144,14 @@ class PalimpsestSessionMiddleware(AgentMiddleware):
         if not self._anonymize_tool_results:
             return result
         if isinstance(result, ToolMessage):
-            updated = copy(result)
-            updated.content = transform_content(
-                result.content,
-                lambda text: _call_text_transform(session, "anonymize", text),
+            return result.model_copy(
+                update={
+                    "content": transform_content(
+                        result.content,
+                        lambda text: _call_text_transform(session, "anonymize", text),
+                    )
+                }
             )
-            return updated
         return result
 
 
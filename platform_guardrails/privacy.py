@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from copy import copy
+from collections import OrderedDict
 import inspect
 from importlib.util import find_spec
 from threading import RLock
-from typing import Any, Callable, Dict, Iterable, List, Mapping
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Set, Tuple
 
 from langchain_core.messages import BaseMessage
 from langchain_core.runnables import RunnableConfig
@@ -29,6 +29,9 @@ PALIMPSEST_FAKE_REPLACEMENT = "fake"
 PALIMPSEST_TYPED_PLACEHOLDER_REPLACEMENT = "typed_placeholder"
 
 _DEFAULT_SESSION_ID = "__manual__"
+# Memo of anonymized texts shared by all sessions (history and system prompts are re-sent every turn).
+_ANONYMIZED_MEMO_SIZE = 4096
+_ANONYMIZED_MEMO_MAX_CHARS = 8192
 _TEXT_KEYS = ("text", "content", "input", "title", "caption", "markdown", "explanation")
 _PALIMPSEST_SPACY_MODELS_BY_LOCALE = {
     "ru": "ru_core_news_sm",
@@ -48,6 +51,25 @@ def _call_text_transform(target: Any, method_name: str, text: str) -> str:
     raise AttributeError(f"{target!r} has no {method_name!r} text transform")
 
 
+def _batch_text_transform(target: Any, method_name: str, texts: List[str]) -> List[str]:
+    """Transform ``texts`` with one backend call per distinct string.
+
+    Uses a ``<method>_batch`` entry point when the backend offers one.
+    """
+    unique = list(dict.fromkeys(texts))
+    batch = None
+    for candidate in _METHOD_ALIASES.get(method_name, (method_name,)):
+        batch = getattr(target, f"{candidate}_batch", None)
+        if callable(batch):
+            break
+    if callable(batch):
+        results = list(batch(unique))
+    else:
+        results = [_call_text_transform(target, method_name, text) for text in unique]
+    transformed = dict(zip(unique, results))
+    return [transformed[text] for text in texts]
+
+
 def _supports_var_kwargs(callable_obj: Callable[..., Any]) -> bool:
     try:
         signature = inspect.signature(callable_obj)
@@ -238,6 +260,9 @@ class PalimpsestSessionManager:
         self._default_session_id = _normalise_session_id(default_session_id)
         self._create_session_kwargs = dict(create_session_kwargs or {})
         self._sessions: Dict[str, Any] = {}
+        # LRU over (session, text), plus each session's memo keys so a reset frees them
+        self._anonymized: OrderedDict[Tuple[str, str], str] = OrderedDict()
+        self._anonymized_keys: Dict[str, Set[Tuple[str, str]]] = {}
         self._lock = RLock()
 
     def get_session(self, session_id: Any = None) -> Any:
@@ -253,6 +278,7 @@ class PalimpsestSessionManager:
                 )
                 session = self._processor.create_session(**session_kwargs)
                 self._sessions[key] = session
+                self._forget_anonymized(key)
             return session
 
     def session_for_config(self, config: RunnableConfig | None) -> Any:
@@ -264,6 +290,7 @@ class PalimpsestSessionManager:
     def reset_session(self, session_id: Any = None) -> None:
         key = _normalise_session_id(session_id or self._default_session_id)
         with self._lock:
+            self._forget_anonymized(key)
             session = self._sessions.get(key)
             if session is None or bool(getattr(session, "closed", False)):
                 return
@@ -274,8 +301,46 @@ class PalimpsestSessionManager:
     def reset_from_config(self, config: RunnableConfig | None) -> None:
         self.reset_session(thread_id_from_config(config))
 
+    def _forget_anonymized(self, key: str) -> None:
+        for memo_key in self._anonymized_keys.pop(key, ()):
+            self._anonymized.pop(memo_key, None)
+
     def anonymize(self, text: str, *, session_id: Any = None) -> str:
-        return _call_text_transform(self.get_session(session_id), "anonymize", text)
+        return self.anonymize_many([text], session_id=session_id)[0]
+
+    def anonymize_many(self, texts: List[str], *, session_id: Any = None) -> List[str]:
+        """Anonymize ``texts`` in one session pass, reusing results already seen in this session.
+
+        A session maps each entity to a stable replacement until it is reset, so
+        re-anonymizing an unchanged text yields the same output.
+        """
+        key = _normalise_session_id(session_id or self._default_session_id)
+        session = self.get_session(key)
+        with self._lock:
+            memo_keys = self._anonymized_keys.setdefault(key, set())
+            known: Dict[str, str] = {}
+            for text in texts:
+                result = self._anonymized.get((key, text))
+                if result is not None:
+                    known[text] = result
+                    self._anonymized.move_to_end((key, text))
+        misses = [text for text in dict.fromkeys(texts) if text not in known]
+        if misses:
+            fresh = _batch_text_transform(session, "anonymize", misses)
+            known.update(zip(misses, fresh))
+            with self._lock:
+                # Skip memoizing if the session was reset while the batch was anonymized
+                if self._anonymized_keys.get(key) is memo_keys:
+                    for text, result in zip(misses, fresh):
+                        if len(text) <= _ANONYMIZED_MEMO_MAX_CHARS:
+                            self._anonymized[(key, text)] = result
+                            memo_keys.add((key, text))
+                    while len(self._anonymized) > _ANONYMIZED_MEMO_SIZE:
+                        evicted, _ = self._anonymized.popitem(last=False)
+                        evicted_keys = self._anonymized_keys.get(evicted[0])
+                        if evicted_keys is not None:
+                            evicted_keys.discard(evicted)
+        return [known[text] for text in texts]
 
     def deanonymize(self, text: str, *, session_id: Any = None) -> str:
         return _call_text_transform(self.get_session(session_id), "deanonymize", text)
@@ -408,10 +473,13 @@ def transform_content(content: Any, transform: Callable[[str], str]) -> Any:
         result: List[Any] = []
         for item in content:
             if isinstance(item, dict):
+                keys = [key for key in _TEXT_KEYS if isinstance(item.get(key), str)]
+                if not keys:
+                    result.append(item)
+                    continue
                 part = dict(item)
-                for key in _TEXT_KEYS:
-                    if isinstance(part.get(key), str):
-                        part[key] = transform(part[key])
+                for key in keys:
+                    part[key] = transform(part[key])
                 result.append(part)
             else:
                 result.append(item)
@@ -420,9 +488,45 @@ def transform_content(content: Any, transform: Callable[[str], str]) -> Any:
 
 
 def clone_message_with_transform(message: BaseMessage, transform: Callable[[str], str]) -> BaseMessage:
-    cloned = copy(message)
-    cloned.content = transform_content(message.content, transform)
-    return cloned
+    # model_copy(update=...) writes the field straight into the copy's __dict__, skipping __setattr__.
+    return message.model_copy(update={"content": transform_content(message.content, transform)})
+
+
+def clone_messages_with_batch_transform(
+    messages: Iterable[BaseMessage],
+    transform_many: Callable[[List[str]], List[str]],
+) -> List[BaseMessage]:
+    """Clone ``messages`` transforming every text field with a single ``transform_many`` call."""
+    messages = list(messages)
+    contents: List[Any] = []
+    # One flat pass: (container, key) slots and their texts, scattered back after the batch call.
+    slots: List[tuple[Any, Any]] = []
+    texts: List[str] = []
+    for message in messages:
+        content = message.content
+        if isinstance(content, str):
+            slots.append((contents, len(contents)))
+            texts.append(content)
+        elif isinstance(content, list):
+            content = list(content)
+            for index, item in enumerate(content):
+                if not isinstance(item, dict):
+                    continue
+                keys = [key for key in _TEXT_KEYS if isinstance(item.get(key), str)]
+                if not keys:
+                    continue
+                part = content[index] = dict(item)
+                for key in keys:
+                    slots.append((part, key))
+                    texts.append(part[key])
+        contents.append(content)
+    if texts:
+        for (container, key), value in zip(slots, transform_many(texts)):
+            container[key] = value
+    return [
+        message.model_copy(update={"content": content})
+        for message, content in zip(messages, contents)
+    ]
 
 
 def transform_messages(messages: Iterable[BaseMessage], transform: Callable[[str], str]) -> List[BaseMessage]:
@@ -438,6 +542,7 @@ __all__ = [
     "_call_text_transform",
     "anonymize_with_session",
     "clone_message_with_transform",
+    "clone_messages_with_batch_transform",
     "content_is_reset",
     "entity_types_from_replacements",
     "map_strings",
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import hashlib
+
+import pytest
+
+from agents.ideator_old_agent import prompts
+
+
+# sha256 of the prompt texts before they were assembled from shared skeletons and token tables
+BASELINE_PROMPT_SHA256 = {
+    ("ru", "ideator_system_prompt"): "bb72d2a68722ac63eec101fdd78deb09f32a5dd2967c73234e77ad16f354a9f7",
+    ("en", "ideator_system_prompt"): "13ea1d04f50a7ecbe54abf1f020c213b4291d8c44cf76b03061a16f8bfcdb442",
+    ("ru", "sense_line_instruction"): "c592c1f4d04e1c60302e5e91d6d4ea7b57ade3de3aeb631d3bae52f03d06d26a",
+    ("en", "sense_line_instruction"): "26320db0f2fb9567aa7873a25b757df0f718bc5b953770d981e368bdfda29ca3",
+    ("ru", "ideas_instruction"): "7348f9281c5bbd8314f65fa14c40836f7d7d62e148ad8102b8ca9c16a68cf12f",
+    ("en", "ideas_instruction"): "875209e43da8efe4873040a64d88371f95f13abc4df1d66bf612862f919dd7ab",
+}
+
+
+def test_locale_tables_point_at_current_instruction_constants():
+    ru = prompts.LOCALES["ru"]["prompts"]
+    en = prompts.LOCALES["en"]["prompts"]
+
+    assert ru["sense_line_instruction"] is prompts.SENSE_LINE_INSTRUCTION
+    assert en["sense_line_instruction"] is prompts.SENSE_LINE_INSTRUCTION_EN
+    assert ru["ideas_instruction"] is prompts.IDEAS_INSTRUCTION
+    assert en["ideas_instruction"] is prompts.IDEAS_INSTRUCTION_EN
+
+
+@pytest.mark.parametrize(("locale", "key"), sorted(BASELINE_PROMPT_SHA256))
+def test_assembled_prompts_are_byte_identical_to_baseline(locale, key):
+    text = prompts.LOCALES[locale]["prompts"][key]
+
+    assert hashlib.sha256(text.encode("utf-8")).hexdigest() == BASELINE_PROMPT_SHA256[(locale, key)]
+
+
+def test_legacy_sense_line_instruction_is_gone():
+    assert not hasattr(prompts, "SENSE_LINE_INSTRUCTION_OLD")
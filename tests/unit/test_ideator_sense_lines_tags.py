@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+
+from agents.ideator_agent.sense_lines_pipeline import compute_ctfidf_tags
+
+
+DOCS = [
+    "нефть газ цены рост",
+    "газ экспорт европа",
+    "цены газ нефть",
+    "банки ставка кредит",
+    "ставка цб кредит рост",
+    "банки депозит ставка",
+    "авто продажи рост",
+    "авто электромобили продажи",
+]
+DOC_CLASSES = np.array([0, 0, 0, 1, 1, 1, 2, 2])
+
+
+def _joined_class_tags(min_df, max_df) -> list[set[str]]:
+    texts = ["\n".join(d for d, c in zip(DOCS, DOC_CLASSES) if c == k) for k in range(3)]
+    vectorizer = CountVectorizer(
+        min_df=min_df,
+        max_df=max_df,
+        token_pattern=r"(?u)\b[0-9A-Za-zА-Яа-яЁё\-]{2,}\b",
+    )
+    X = TfidfTransformer(norm=None, smooth_idf=True).fit_transform(vectorizer.fit_transform(texts))
+    vocab = vectorizer.get_feature_names_out()
+    return [set(vocab[X.getrow(i).indices].tolist()) for i in range(3)]
+
+
+def test_document_frequency_bounds_match_countvectorizer_on_joined_class_texts():
+    for min_df, max_df in [(1, 1.0), (2, 1.0), (1, 0.5), (1, 2)]:
+        tags = compute_ctfidf_tags(
+            docs=DOCS,
+            doc_classes=DOC_CLASSES,
+            n_classes=3,
+            stopwords_list=None,
+            top_n=100,
+            ngram_max=1,
+            min_df=min_df,
+            max_df=max_df,
+        )
+        assert [set(t) for t in tags] == _joined_class_tags(min_df, max_df)
+
+
+def test_rerank_uses_doc_embeddings_and_keeps_top_n():
+    rng = np.random.default_rng(0)
+    doc_emb = rng.standard_normal((len(DOCS), 4)).astype(np.float32)
+    doc_emb /= np.linalg.norm(doc_emb, axis=1, keepdims=True)
+    centroids = np.stack([doc_emb[DOC_CLASSES == k].mean(axis=0) for k in range(3)])
+
+    plain = compute_ctfidf_tags(DOCS, DOC_CLASSES, 3, None, top_n=4, ngram_max=1, min_df=1, max_df=1.0)
+    reranked = compute_ctfidf_tags(
+        DOCS,
+        DOC_CLASSES,
+        3,
+        None,
+        top_n=2,
+        ngram_max=1,
+        min_df=1,
+        max_df=1.0,
+        doc_emb=doc_emb,
+        centroids=centroids,
+    )
+
+    for pool, tags in zip(plain, reranked):
+        assert len(tags) == 2
+        # Survivors come from the 2*top_n candidate pool and keep its c-TF-IDF order
+        assert tags == [t for t in pool if t in tags]
@@ -25,6 +25,14 @@ def test_reset_or_run_accepts_content_parts():
     assert result == "reset_memory"
 
 
+def test_reset_or_run_routes_regular_turns_to_agent():
+    state = {"messages": [HumanMessage(content="What does the policy cover?")]}
+
+    result = ingos_agent.reset_or_run(state, {})
+
+    assert result == "default_agent"
+
+
 def test_content_text_accepts_string_and_content_parts():
     assert ingos_agent._content_text("plain text") == "plain text"
     assert (
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import datetime
+import os
+from types import SimpleNamespace
+
+import openpyxl
+import pandas as pd
+
+from agents.ingos_product_agent.retrievers import vector_store
+from agents.ingos_product_agent.retrievers.vector_store import Document, VectorStore, _read_excel_sheet
+
+
+def _write_workbook(path) -> None:
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    worksheet.append(["Name", "Name", None, "Price", "Name"])
+    worksheet.append(["a", "b", 1, 2.0, "x"])
+    worksheet.append([None, None, None, None, None])
+    worksheet.append(["c", None, 3.5, 4, datetime.datetime(2024, 1, 2)])
+    worksheet.append(["d", "e|f", None, None, None, "extra"])
+    # Formatted but empty trailing row: pandas drops it
+    worksheet.cell(row=8, column=1).font = openpyxl.styles.Font(bold=True)
+    workbook.save(path)
+
+
+def _read(path, max_rows):
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        return _read_excel_sheet(workbook.active, max_rows)
+    finally:
+        workbook.close()
+
+
+def test_read_excel_sheet_matches_pandas_read_excel(tmp_path):
+    path = tmp_path / "sheet.xlsx"
+    _write_workbook(path)
+
+    headers, rows, total_rows = _read(path, max_rows=100)
+
+    expected = pd.read_excel(path, dtype=str).fillna("")
+    assert headers == ["Name", "Name.1", "Unnamed: 2", "Price", "Name.2", "Unnamed: 5"]
+    assert headers == list(expected.columns)
+    assert rows == expected.values.tolist()
+    assert total_rows == len(expected) == 4
+
+
+def test_read_excel_sheet_counts_rows_past_the_limit(tmp_path):
+    path = tmp_path / "sheet.xlsx"
+    _write_workbook(path)
+
+    headers, rows, total_rows = _read(path, max_rows=2)
+
+    assert rows == [["a", "b", "1", "2", "x"], ["", "", "", "", ""]]
+    assert headers[:5] == ["Name", "Name.1", "Unnamed: 2", "Price", "Name.2"]
+    assert total_rows == 4
+
+
+class FakeChroma:
+    def __init__(self, rows):
+        self.rows = dict(rows)
+
+    def get(self, include):
+        return {"ids": list(self.rows), "metadatas": list(self.rows.values())}
+
+    def delete(self, ids):
+        for chunk_id in ids:
+            del self.rows[chunk_id]
+
+
+class FakeEmbeddings:
+    model = "fake-embedding"
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 0.5] for text in texts]
+
+    async def aembed_documents(self, texts):
+        return self.embed_documents(texts)
+
+
+def _bare_store(tmp_path, **attrs) -> VectorStore:
+    store = VectorStore.__new__(VectorStore)
+    store.vector_store_path = str(tmp_path / "vs")
+    store.lock_file_path = str(tmp_path / "vs.lock")
+    store._notify = lambda message: None
+    for name, value in attrs.items():
+        setattr(store, name, value)
+    return store
+
+
+def test_incremental_update_reindexes_added_modified_and_removed_files(tmp_path):
+    docs_dir = tmp_path / "docs"
+    norm_dir = tmp_path / "norm"
+    (norm_dir / "sub").mkdir(parents=True)
+    docs_dir.mkdir()
+    (norm_dir / "sub" / "m.xlsx__S1.norm.txt").write_text("old sheet", encoding="utf-8")
+    (norm_dir / "keep.txt.norm.txt").write_text("kept", encoding="utf-8")
+
+    def src(rel):
+        return str(docs_dir / rel)
+
+    chroma = FakeChroma(
+        {
+            "1": {"source": src("a.txt")},
+            "2": {"source": src("sub/m.xlsx"), "sheet_name": "S1"},
+            "3": {"source": str(norm_dir / "sub" / "m.xlsx__S1.norm.txt"), "normalized": True},
+            "4": {"source": src("gone.txt")},
+        }
+    )
+    embedded: list[str] = []
+    saved: list = []
+    store = _bare_store(
+        tmp_path,
+        docs_path=str(docs_dir),
+        normalized_output_dir=str(norm_dir),
+        save_normalized_docs=True,
+        vectorstore=chroma,
+        _gather_source_files=lambda: [
+            {"rel": "a.txt", "mtime": 1, "size": 1},
+            {"rel": "sub/m.xlsx", "mtime": 2, "size": 1},
+            {"rel": "new.txt", "mtime": 1, "size": 1},
+        ],
+        _load_documents=lambda: [
+            Document(page_content="a", metadata={"source": src("a.txt")}),
+            Document(page_content="m", metadata={"source": src("sub/m.xlsx"), "sheet_name": "S1"}),
+            Document(page_content="n", metadata={"source": src("new.txt")}),
+        ],
+        _save_raw_documents=lambda documents: None,
+        _split_documents=lambda documents: documents,
+        _embed_and_write=lambda target, chunks: embedded.extend(c.metadata["source"] for c in chunks),
+        _save_manifest=saved.append,
+    )
+    manifest = {
+        "files": [
+            {"rel": "a.txt", "mtime": 1, "size": 1},
+            {"rel": "sub/m.xlsx", "mtime": 1, "size": 1},
+            {"rel": "gone.txt", "mtime": 1, "size": 1},
+        ]
+    }
+
+    store._apply_incremental_update(manifest)
+
+    # The modified workbook's sheet and its normalized copy are dropped with the removed file
+    assert sorted(chroma.rows) == ["1"]
+    assert embedded == [src("sub/m.xlsx"), src("new.txt")]
+    assert not (norm_dir / "sub" / "m.xlsx__S1.norm.txt").exists()
+    assert (norm_dir / "keep.txt.norm.txt").exists()
+    assert [item["rel"] for item in saved[0]] == ["a.txt", "sub/m.xlsx", "new.txt"]
+
+
+def test_pack_batches_splits_on_item_and_token_limits(monkeypatch, tmp_path):
+    encoding = SimpleNamespace(encode_batch=lambda texts, disallowed_special: [list(text) for text in texts])
+    monkeypatch.setattr(vector_store, "tiktoken", SimpleNamespace(encoding_for_model=lambda model: encoding))
+    monkeypatch.setattr(vector_store, "_EMBED_BATCH_MAX_ITEMS", 3)
+    monkeypatch.setattr(vector_store, "_EMBED_BATCH_MAX_TOKENS", 10)
+    store = _bare_store(tmp_path)
+
+    # Item limit: three single-token texts per batch
+    assert store._pack_batches(["a"] * 7) == [(0, 3, 3), (3, 6, 3), (6, 7, 1)]
+    # Token limit: a batch closes before it would exceed 10 tokens
+    assert store._pack_batches(["aaaa", "aaaaaa", "aa", "aaaaaaaaa"]) == [(0, 2, 10), (2, 3, 2), (3, 4, 9)]
+    # An oversized text still gets a batch of its own
+    assert store._pack_batches(["a" * 12, "a"]) == [(0, 1, 12), (1, 2, 1)]
+
+
+def test_pack_batches_without_tiktoken_uses_item_limit_only(monkeypatch, tmp_path):
+    monkeypatch.setattr(vector_store, "tiktoken", None)
+    monkeypatch.setattr(vector_store, "_EMBED_BATCH_MAX_ITEMS", 2)
+
+    assert _bare_store(tmp_path)._pack_batches(["a", "b", "c"]) == [(0, 2, None), (2, 3, None)]
+
+
+def test_embed_and_write_requests_only_uncached_chunks(tmp_path):
+    embeddings = FakeEmbeddings()
+    written: list[tuple[str, list[float]]] = []
+    store = _bare_store(
+        tmp_path,
+        embeddings=embeddings,
+        embedding_concurrency=2,
+        _add_embedded_chunks=lambda target, chunks, vectors: written.extend(
+            (chunk.page_content, list(vector)) for chunk, vector in zip(chunks, vectors)
+        ),
+    )
+
+    def chunks(*texts):
+        return [Document(page_content=text, metadata={}) for text in texts]
+
+    store._embed_and_write(None, chunks("a", "bb"))
+    assert embeddings.calls == [["a", "bb"]]
+
+    written.clear()
+    store._embed_and_write(None, chunks("bb", "ccc", "a"))
+
+    assert embeddings.calls == [["a", "bb"], ["ccc"]]
+    assert sorted(written) == [("a", [1.0, 0.5]), ("bb", [2.0, 0.5]), ("ccc", [3.0, 0.5])]
+
+
+def test_remove_stale_rebuild_dirs_keeps_unrelated_siblings(tmp_path):
+    for name in ["vs", "vs_backup_17", "vs_backup_x", ".vs_new_18", ".vs_new_", "other_backup_1", "vs2_backup_3"]:
+        (tmp_path / name).mkdir()
+    (tmp_path / "vs_backup_19").write_text("not a directory", encoding="utf-8")
+
+    _bare_store(tmp_path)._remove_stale_rebuild_dirs()
+
+    assert sorted(os.listdir(tmp_path)) == [
+        ".vs_new_",
+        "other_backup_1",
+        "vs",
+        "vs2_backup_3",
+        "vs_backup_19",
+        "vs_backup_x",
+    ]
@@ -143,3 +143,85 @@ def test_async_tool_wrapper_uses_runtime_config_thread_session():
 
     assert captured["args"] == {"query": "deanon[conv-tool](fake user)"}
     assert result.content == "anon[conv-tool](real tool result)"
+
+
+def test_middleware_anonymizes_each_distinct_text_once_per_request():
+    processor = FakeProcessor()
+    manager = PalimpsestSessionManager(processor)
+    middleware = PalimpsestSessionMiddleware(manager)
+    runtime = SimpleNamespace(execution_info=SimpleNamespace(thread_id="conv-batch"))
+    session = manager.get_session("conv-batch")
+    calls: list[str] = []
+    original_anonymize = session.anonymize
+
+    def counting_anonymize(text: str) -> str:
+        calls.append(text)
+        return original_anonymize(text)
+
+    session.anonymize = counting_anonymize
+    request = ModelRequest(
+        model=object(),
+        messages=[
+            HumanMessage(content="hello"),
+            HumanMessage(content=[{"type": "text", "text": "hello"}, {"type": "text", "text": "world"}]),
+        ],
+        state={"messages": []},
+        runtime=runtime,
+    )
+    captured = {}
+
+    def handler(updated_request):
+        captured["messages"] = updated_request.messages
+        return ModelResponse(result=[AIMessage(content="ok")])
+
+    middleware.wrap_model_call(request, handler)
+
+    assert calls == ["hello", "world"]
+    assert captured["messages"][0].content == "anon[conv-batch](hello)"
+    assert captured["messages"][1].content == [
+        {"type": "text", "text": "anon[conv-batch](hello)"},
+        {"type": "text", "text": "anon[conv-batch](world)"},
+    ]
+
+
+def test_session_manager_reuses_anonymized_text_until_reset():
+    processor = FakeProcessor()
+    manager = PalimpsestSessionManager(processor)
+    session = manager.get_session("thread-1")
+    calls: list[str] = []
+    original_anonymize = session.anonymize
+
+    def counting_anonymize(text: str) -> str:
+        calls.append(text)
+        return original_anonymize(text)
+
+    session.anonymize = counting_anonymize
+
+    assert manager.anonymize_many(["prompt", "hello"], session_id="thread-1") == [
+        "anon[thread-1](prompt)",
+        "anon[thread-1](hello)",
+    ]
+    assert manager.anonymize("prompt", session_id="thread-1") == "anon[thread-1](prompt)"
+    assert calls == ["prompt", "hello"]
+
+    manager.reset_session("thread-1")
+    manager.anonymize("prompt", session_id="thread-1")
+
+    assert calls == ["prompt", "hello", "prompt"]
+
+
+def test_session_manager_memo_is_bounded_across_sessions_and_freed_on_reset(monkeypatch):
+    from platform_guardrails import privacy
+
+    monkeypatch.setattr(privacy, "_ANONYMIZED_MEMO_SIZE", 3)
+    manager = PalimpsestSessionManager(FakeProcessor())
+
+    manager.anonymize_many(["a", "b"], session_id="thread-1")
+    manager.anonymize_many(["c", "d"], session_id="thread-2")
+
+    assert list(manager._anonymized) == [("thread-1", "b"), ("thread-2", "c"), ("thread-2", "d")]
+
+    manager.reset_session("thread-2")
+
+    assert list(manager._anonymized) == [("thread-1", "b")]
+    assert manager._anonymized_keys == {"thread-1": {("thread-1", "b")}}
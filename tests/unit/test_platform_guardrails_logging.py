@@ -4,7 +4,7 @@ from types import SimpleNamespace
 
 from langchain_core.messages import ToolMessage
 
-from platform_guardrails.logging import RedactingJSONFileTracer, redact_value
+from platform_guardrails.logging import BackgroundLogWriter, RedactingJSONFileTracer, redact_value
 
 
 def test_redact_value_redacts_sensitive_keys_and_common_secret_patterns():
@@ -57,3 +57,14 @@ def test_redacting_json_file_tracer_does_not_write_raw_prompts_outputs_or_tokens
     assert "response_chars" in text
     assert "token_chars" in text
     assert "input_chars" in text
+
+
+def test_background_log_writer_appends_records_in_order(tmp_path):
+    log_path = tmp_path / "logs" / "anon.log"
+    writer = BackgroundLogWriter(str(log_path))
+
+    writer.write("first\n")
+    writer.write("second\n")
+    writer.close()
+
+    assert log_path.read_text(encoding="utf-8") == "first\nsecond\n"